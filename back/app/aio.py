@@ -0,0 +1,79 @@
+import functools
+import inspect
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_db, get_db
+
+
+def _asyncify(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    sig = inspect.signature(endpoint)
+    db_param = next(
+        (
+            p.name
+            for p in sig.parameters.values()
+            if isinstance(p.default, DependsParam) and p.default.dependency is get_db
+        ),
+        None,
+    )
+    if db_param is None:
+        return endpoint
+
+    # run_sync executes the whole handler on the event-loop thread in a
+    # greenlet, yielding to the loop only for driver I/O. That suits handlers
+    # whose CPU work is a few rows' worth; routes that pivot or encode large
+    # responses get a native async handler instead (see asyncify_router).
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        db: AsyncSession = kwargs.pop(db_param)
+        return await db.run_sync(lambda session: endpoint(**kwargs, **{db_param: session}))
+
+    wrapper.__signature__ = sig.replace(
+        parameters=[
+            p.replace(default=Depends(get_async_db), annotation=AsyncSession) if p.name == db_param else p
+            for p in sig.parameters.values()
+        ]
+    )
+    return wrapper
+
+
+def asyncify_router(router: APIRouter, native: APIRouter | None = None) -> APIRouter:
+    # Routes of `native` (same path and methods) replace their sync
+    # counterparts; every other sync handler runs unchanged on the
+    # AsyncSession's sync facade via run_sync.
+    replacements = {
+        (route.path, frozenset(route.methods)): route
+        for route in (native.routes if native is not None else ())
+        if isinstance(route, APIRoute)
+    }
+    out = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            out.routes.append(route)
+            continue
+        replacement = replacements.get((route.path, frozenset(route.methods)))
+        if replacement is not None:
+            out.routes.append(replacement)
+            continue
+        out.add_api_route(
+            route.path,
+            _asyncify(route.endpoint),
+            methods=route.methods,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            responses=route.responses,
+            response_class=route.response_class,
+            name=route.name,
+            include_in_schema=route.include_in_schema,
+        )
+    return out
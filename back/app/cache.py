@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.metrics import REGISTRY
+
+CACHES: dict[str, Any] = {}
+
+
+SWEEP_MIN_SIZE = 1024
+
+
+class TTLCache:
+    # maxsize=None never evicts a live entry; expired ones are swept whenever the
+    # cache has doubled since the last sweep.
+    def __init__(self, name: str, maxsize: int | None, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._sweep_at = SWEEP_MIN_SIZE
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, key: Hashable) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        # ttl overrides the cache-wide lifetime for this entry only.
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            if self.maxsize is None:
+                if len(self._data) >= self._sweep_at:
+                    self._sweep(time.monotonic())
+                return
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        for key in [k for k, (_, expires) in self._data.items() if expires <= now]:
+            del self._data[key]
+        self._sweep_at = max(SWEEP_MIN_SIZE, 2 * len(self._data))
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+def _cache_metrics():
+    stats = [(c.name, c.stats()) for c in CACHES.values()]
+    yield "cache_hits_total", "Cache hits", "counter", [("cache_hits_total", {"cache": n}, s["hits"]) for n, s in stats]
+    yield "cache_misses_total", "Cache misses", "counter", [
+        ("cache_misses_total", {"cache": n}, s["misses"]) for n, s in stats
+    ]
+    yield "cache_hit_ratio", "Cache hits over lookups", "gauge", [
+        ("cache_hit_ratio", {"cache": n}, s["hits"] / (s["hits"] + s["misses"]) if s["hits"] + s["misses"] else 0.0)
+        for n, s in stats
+    ]
+    yield "cache_entries", "Entries currently cached", "gauge", [
+        ("cache_entries", {"cache": n}, s["size"]) for n, s in stats
+    ]
+    yield "cache_bytes", "Bytes currently cached", "gauge", [
+        ("cache_bytes", {"cache": n}, s["bytes"]) for n, s in stats if "bytes" in s
+    ]
+
+
+REGISTRY.register_collector(_cache_metrics)
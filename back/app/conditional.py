@@ -0,0 +1,34 @@
+import hashlib
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    return 'W/"%s"' % hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored.
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def conditional_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(request: Request, response: Response, *parts) -> Response | None:
+    # Returns a bodiless 304 when the client already holds the current
+    # representation; otherwise tags the outgoing response and returns None.
+    etag = make_etag(*parts)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=conditional_headers(etag))
+    response.headers.update(conditional_headers(etag))
+    return None
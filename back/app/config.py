@@ -3,11 +3,50 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
+    async_database_url: str | None = None
+    db_async: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = -1
+    db_pool_ping: str = "pessimistic"
     jwt_secret: str
     jwt_alg: str = "HS256"
     jwt_expires_minutes: int = 720
     cors_origins: str = "http://localhost:3000"
-    seed_on_start: bool = True
+    seed_on_start: bool = False
+    schema_on_start: str = "check"
+    log_level: str = "INFO"
+    profile_requests: bool = True
+    slow_query_ms: float = 200
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_size: int = 10000
+    token_cache_size: int = 10000
+    password_workers: int = 2
+    password_queue_limit: int = 32
+    response_cache_backend: str = "local"
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_url: str | None = None
+    response_cache_ttl_seconds: int = 3600
+    live_bus_backend: str = "local"
+    live_bus_url: str | None = None
+    live_queue_size: int = 256
+    live_keepalive_seconds: float = 15
+    live_ticket_seconds: int = 60
+    web_concurrency: int = 1
+
+    def resolved_async_database_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        url = self.database_url
+        for sync_prefix, async_prefix in (
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if url.startswith(sync_prefix):
+                return async_prefix + url[len(sync_prefix):]
+        return url
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,308 @@
+import argparse
+import csv
+import io
+import itertools
+import sys
+import time as timer
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.engine import Connection
+
+from app.journal_totals import refresh_totals
+from app.models import (
+    Assignment,
+    AssignmentSubmission,
+    AttendanceRecord,
+    Discipline,
+    GradeRecord,
+    Group,
+    ScheduleItem,
+    Student,
+    Teacher,
+    Topic,
+    User,
+)
+from app.security import hash_password
+from app.versions import TRACKED_TABLES, bump_table_versions
+
+CHUNK_ROWS = 50_000
+LESSON_SLOTS = [
+    (time(9, 0), time(10, 30)),
+    (time(10, 40), time(12, 10)),
+    (time(12, 40), time(14, 10)),
+    (time(14, 20), time(15, 50)),
+]
+
+
+@dataclass
+class DatasetSpec:
+    groups: int = 3
+    students_per_group: int = 25
+    disciplines: int = 10
+    disciplines_per_group: int = 5
+    topics_per_discipline: int = 8
+    weeks: int = 16
+    lessons_per_day: int = 2
+    start: date = date(2025, 9, 1)
+    password: str = "student"
+
+
+def _chunks(rows: Iterable[tuple], size: int = CHUNK_ROWS) -> Iterator[list[tuple]]:
+    it = iter(rows)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def _copy(conn: Connection, table: Table, columns: list[str], rows: Iterable[tuple]) -> int:
+    written = 0
+    if conn.dialect.name == "postgresql":
+        cursor = conn.connection.dbapi_connection.cursor()
+        sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        for chunk in _chunks(rows):
+            buf = io.StringIO()
+            csv.writer(buf).writerows(chunk)
+            buf.seek(0)
+            cursor.copy_expert(sql, buf)
+            written += len(chunk)
+        cursor.close()
+    else:
+        for chunk in _chunks(rows):
+            conn.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+            written += len(chunk)
+    return written
+
+
+def _next_id(conn: Connection, table: Table) -> int:
+    return (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _sync_sequences(conn: Connection, tables: list[Table]) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT max(id) FROM {table.name}))")
+        )
+
+
+def _attendance_status(student_id: int, day: date) -> str:
+    return "отсутствовал" if (student_id + day.toordinal()) % 7 == 0 else "присутствовал"
+
+
+def semester_days(start: date, weeks: int) -> list[date]:
+    return [start + timedelta(days=7 * w + wd) for w in range(weeks) for wd in range(5)]
+
+
+def generate(conn: Connection, spec: DatasetSpec) -> dict:
+    # Ids are assigned here rather than read back, so every table can be
+    # streamed with COPY (or executemany) without a round-trip per row.
+    tables = [t.__table__ for t in (User, Teacher, Group, Student, Discipline, Topic, Assignment, ScheduleItem)]
+    tables += [AttendanceRecord.__table__, GradeRecord.__table__, AssignmentSubmission.__table__]
+    ids = {t.name: _next_id(conn, t) for t in tables}
+    tag = ids["users"]
+    password_hash = hash_password(spec.password)
+    now = datetime.utcnow()
+    counts: dict[str, int] = {}
+
+    student_count = spec.groups * spec.students_per_group
+    teacher_user_ids = range(ids["users"], ids["users"] + spec.disciplines)
+    student_user_ids = range(teacher_user_ids.stop, teacher_user_ids.stop + student_count)
+    counts["users"] = _copy(
+        conn,
+        User.__table__,
+        ["id", "username", "password_hash", "role", "full_name", "is_active"],
+        itertools.chain(
+            (
+                (uid, f"gen{tag}-t{i}", password_hash, "teacher", f"Преподаватель {i}", True)
+                for i, uid in enumerate(teacher_user_ids)
+            ),
+            (
+                (uid, f"gen{tag}-s{i}", password_hash, "student", f"Студент {i}", True)
+                for i, uid in enumerate(student_user_ids)
+            ),
+        ),
+    )
+
+    teacher_ids = range(ids["teachers"], ids["teachers"] + spec.disciplines)
+    counts["teachers"] = _copy(conn, Teacher.__table__, ["id", "user_id"], zip(teacher_ids, teacher_user_ids))
+
+    group_ids = range(ids["groups"], ids["groups"] + spec.groups)
+    counts["groups"] = _copy(
+        conn,
+        Group.__table__,
+        ["id", "name"],
+        ((gid, f"Группа {tag}-{gid}") for gid in group_ids),
+    )
+
+    student_ids = range(ids["students"], ids["students"] + student_count)
+    student_group = [group_ids[i // spec.students_per_group] for i in range(student_count)]
+    counts["students"] = _copy(
+        conn,
+        Student.__table__,
+        ["id", "user_id", "group_id"],
+        zip(student_ids, student_user_ids, student_group),
+    )
+
+    discipline_ids = range(ids["disciplines"], ids["disciplines"] + spec.disciplines)
+    counts["disciplines"] = _copy(
+        conn,
+        Discipline.__table__,
+        ["id", "title", "teacher_id", "max_points", "hours_total"],
+        (
+            (did, f"Дисциплина {i}", tid, 100, 56)
+            for i, (did, tid) in enumerate(zip(discipline_ids, teacher_ids))
+        ),
+    )
+
+    topic_base = ids["topics"]
+    topics_by_discipline = {
+        did: list(range(topic_base + i * spec.topics_per_discipline, topic_base + (i + 1) * spec.topics_per_discipline))
+        for i, did in enumerate(discipline_ids)
+    }
+    counts["topics"] = _copy(
+        conn,
+        Topic.__table__,
+        ["id", "discipline_id", "title", "content", "order_index"],
+        (
+            (tid, did, f"Тема {n}", "", n)
+            for did, tids in topics_by_discipline.items()
+            for n, tid in enumerate(tids, start=1)
+        ),
+    )
+
+    # One practical assignment per discipline, on its second topic.
+    assignments = [
+        (ids["assignments"] + i, tids[min(1, len(tids) - 1)], did)
+        for i, (did, tids) in enumerate(topics_by_discipline.items())
+        if tids
+    ]
+    counts["assignments"] = _copy(
+        conn,
+        Assignment.__table__,
+        ["id", "topic_id", "discipline_id", "title", "text", "max_points"],
+        ((aid, tid, did, "Практическая работа", "", 10) for aid, tid, did in assignments),
+    )
+
+    per_group = min(spec.disciplines_per_group, spec.disciplines)
+    lessons = min(spec.lessons_per_day, per_group, len(LESSON_SLOTS))
+    group_disciplines = {
+        gid: [discipline_ids[(gid + k) % spec.disciplines] for k in range(per_group)] for gid in group_ids
+    }
+    days = semester_days(spec.start, spec.weeks)
+    lessons_by_group = {
+        gid: [(day, n, discs[(i + n) % per_group]) for i, day in enumerate(days) for n in range(lessons)]
+        for gid, discs in group_disciplines.items()
+    }
+
+    schedule_ids = itertools.count(ids["schedule_items"])
+    counts["schedule_items"] = _copy(
+        conn,
+        ScheduleItem.__table__,
+        ["id", "discipline_id", "group_id", "day", "start_time", "end_time", "room"],
+        (
+            (next(schedule_ids), did, gid, day, *LESSON_SLOTS[n], str(100 + gid % 400))
+            for gid, items in lessons_by_group.items()
+            for day, n, did in items
+        ),
+    )
+
+    attendance_ids = itertools.count(ids["attendance_records"])
+    counts["attendance_records"] = _copy(
+        conn,
+        AttendanceRecord.__table__,
+        ["id", "student_id", "discipline_id", "day", "status", "updated_at"],
+        (
+            (next(attendance_ids), sid, did, day, _attendance_status(sid, day), now)
+            for sid, gid in zip(student_ids, student_group)
+            for day, _, did in lessons_by_group[gid]
+            if day <= now.date()
+        ),
+    )
+
+    grade_ids = itertools.count(ids["grade_records"])
+    counts["grade_records"] = _copy(
+        conn,
+        GradeRecord.__table__,
+        ["id", "student_id", "discipline_id", "topic_id", "points", "max_points", "updated_at"],
+        (
+            (next(grade_ids), sid, did, tid, (sid + tid) % 6, 5, now)
+            for sid, gid in zip(student_ids, student_group)
+            for did in group_disciplines[gid]
+            for tid in topics_by_discipline[did]
+        ),
+    )
+
+    assignments_by_discipline = {did: aid for aid, _, did in assignments}
+    submission_ids = itertools.count(ids["assignment_submissions"])
+    counts["assignment_submissions"] = _copy(
+        conn,
+        AssignmentSubmission.__table__,
+        ["id", "student_id", "assignment_id", "answer_text", "status", "points", "max_points", "updated_at"],
+        (
+            (next(submission_ids), sid, aid, "Ответ: ...", status, points, 10, now)
+            for sid, gid in zip(student_ids, student_group)
+            for did in group_disciplines[gid]
+            if (aid := assignments_by_discipline.get(did)) and (sid + aid) % 3
+            for status, points in [("проверено", 7) if (sid + aid) % 2 else ("сдано", 0)]
+        ),
+    )
+
+    _sync_sequences(conn, tables)
+    refresh_totals(conn)
+    bump_table_versions(conn, {t.name for t in tables} & set(TRACKED_TABLES))
+    return {
+        "counts": counts,
+        "group_ids": list(group_ids),
+        "discipline_ids": list(discipline_ids),
+        "group_disciplines": group_disciplines,
+        "student_usernames": [f"gen{tag}-s{i}" for i in range(student_count)],
+        "student_user_ids": list(student_user_ids),
+        "teacher_user_ids": list(teacher_user_ids),
+        "days": days,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(prog="python -m app.datagen")
+    parser.add_argument("--groups", type=int, default=defaults.groups)
+    parser.add_argument("--students", type=int, default=defaults.students_per_group, help="students per group")
+    parser.add_argument("--disciplines", type=int, default=defaults.disciplines)
+    parser.add_argument("--disciplines-per-group", type=int, default=defaults.disciplines_per_group)
+    parser.add_argument("--topics", type=int, default=defaults.topics_per_discipline, help="topics per discipline")
+    parser.add_argument("--weeks", type=int, default=defaults.weeks)
+    parser.add_argument("--lessons-per-day", type=int, default=defaults.lessons_per_day)
+    parser.add_argument("--start", type=date.fromisoformat, default=defaults.start)
+    parser.add_argument("--password", default=defaults.password)
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(
+        groups=args.groups,
+        students_per_group=args.students,
+        disciplines=args.disciplines,
+        disciplines_per_group=args.disciplines_per_group,
+        topics_per_discipline=args.topics,
+        weeks=args.weeks,
+        lessons_per_day=args.lessons_per_day,
+        start=args.start,
+        password=args.password,
+    )
+
+    from app.db import engine
+
+    t0 = timer.perf_counter()
+    with engine.begin() as conn:
+        result = generate(conn, spec)
+    elapsed = timer.perf_counter() - t0
+
+    for table, n in result["counts"].items():
+        print(f"{table:>24} {n:>10}")
+    print(f"generated in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,45 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.config import settings
+from app.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, register_pool_metrics
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def _pool_options(url: str, poolclass) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")):
+        return {}
+    if settings.db_pool_ping not in ("pessimistic", "optimistic"):
+        raise ValueError("DB_POOL_PING must be 'pessimistic' or 'optimistic'")
+    # "pessimistic" pings on every checkout; "optimistic" skips the round-trip
+    # and relies on pool_recycle plus invalidation when a disconnect is raised.
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_ping == "pessimistic",
+    }
+
+
+engine = create_engine(settings.database_url, **_pool_options(settings.database_url, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    async_url = settings.resolved_async_database_url()
+    async_engine = create_async_engine(async_url, **_pool_options(async_url, InstrumentedAsyncQueuePool))
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False)
+
+register_pool_metrics(
+    {"sync": lambda: engine.pool}
+    if async_engine is None
+    else {"sync": lambda: engine.pool, "async": lambda: async_engine.pool}
+)
+
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +47,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
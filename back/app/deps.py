@@ -1,32 +1,57 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
-from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models import User
-from app.security import decode_token
+from app.config import settings
+from app.db import AsyncSessionLocal, SessionLocal
+from app.principals import Principal, load_principal, principal_cache
+from app.security import decode_stream_ticket, decode_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    user_id = decode_token(token)
+def _load_principal(user_id: int) -> Principal | None:
+    db = SessionLocal()
+    try:
+        return load_principal(db, user_id)
+    finally:
+        db.close()
+
+
+async def _load_principal_async(user_id: int) -> Principal | None:
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(load_principal, user_id)
+
+
+async def _principal(user_id: str | None) -> Principal:
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.execute(select(User).where(User.id == int(user_id))).scalar_one_or_none()
-    if not user or not user.is_active:
-        raise HTTPException(status_code=401, detail="User not found")
+    principal = principal_cache.get(int(user_id))
+    if principal is None:
+        if settings.db_async:
+            principal = await _load_principal_async(int(user_id))
+        else:
+            principal = await run_in_threadpool(_load_principal, int(user_id))
+        if not principal:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal_cache.set(principal.id, principal)
+
+    return principal
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    return await _principal(decode_token(token))
+
 
-    return user
+async def get_stream_user(ticket: str = Query()) -> Principal:
+    # EventSource cannot set headers, so event streams authenticate with a
+    # short-lived ticket from POST /live/ticket in the query string.
+    return await _principal(decode_stream_ticket(ticket))
 
 
 def require_role(role: str):
-    def _inner(user: User = Depends(get_current_user)) -> User:
+    def _inner(user: Principal = Depends(get_current_user)) -> Principal:
         if user.role != role:
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
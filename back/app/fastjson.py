@@ -0,0 +1,18 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+# List endpoints build plain dicts/lists from typed row tuples and return them
+# through here. Returning a Response skips FastAPI's response_model validation
+# pass, which is where most of the CPU went on large payloads; the
+# response_model stays on the route for the OpenAPI schema.
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content)
+
+
+def json_response(content, response: Response | None = None) -> ORJSONResponse:
+    # Headers set on the injected Response (ETag, X-Next-Cursor) are only merged
+    # by FastAPI for non-Response return values, so carry them over here.
+    return ORJSONResponse(content, headers=dict(response.headers) if response is not None else None)
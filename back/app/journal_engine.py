@@ -0,0 +1,165 @@
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import AttendanceRecord, GradeRecord, Student, Topic, User
+from app.versions import table_versions, table_versions_async
+
+NOT_SET = "не выставлено"
+
+# Builders return plain dicts shaped like JournalAttendanceOut/JournalGradesOut.
+# Every value comes from typed columns, so they are encoded directly instead of
+# constructing and re-validating a model per student row.
+
+
+def _record_state_query(model, group_id: int, discipline_id: int, *filters) -> Select:
+    # Latest write plus row count: the count catches deletions, which leave max(updated_at) unchanged.
+    return (
+        select(func.max(model.updated_at), func.count(model.id))
+        .join(Student, model.student_id == Student.id)
+        .where(Student.group_id == group_id)
+        .where(model.discipline_id == discipline_id)
+        .where(*filters)
+    )
+
+
+def _attendance_state_query(group_id: int, discipline_id: int, day_list: list[date]) -> Select:
+    day_filter = AttendanceRecord.day.in_(set(day_list))
+    return _record_state_query(AttendanceRecord, group_id, discipline_id, day_filter)
+
+
+def attendance_journal_state(db: Session, group_id: int, discipline_id: int, day_list: list[date]) -> tuple:
+    records = db.execute(_attendance_state_query(group_id, discipline_id, day_list)).one()
+    return (*records, *table_versions(db, ("students", "users")))
+
+
+def grades_journal_state(db: Session, group_id: int, discipline_id: int) -> tuple:
+    records = db.execute(_record_state_query(GradeRecord, group_id, discipline_id)).one()
+    return (*records, *table_versions(db, ("students", "users", "topics")))
+
+
+async def attendance_journal_state_async(
+    db: AsyncSession, group_id: int, discipline_id: int, day_list: list[date]
+) -> tuple:
+    records = (await db.execute(_attendance_state_query(group_id, discipline_id, day_list))).one()
+    return (*records, *await table_versions_async(db, ("students", "users")))
+
+
+async def grades_journal_state_async(db: AsyncSession, group_id: int, discipline_id: int) -> tuple:
+    records = (await db.execute(_record_state_query(GradeRecord, group_id, discipline_id))).one()
+    return (*records, *await table_versions_async(db, ("students", "users", "topics")))
+
+
+def _students_query(group_id: int) -> Select:
+    return (
+        select(Student.id, User.full_name)
+        .join(User, Student.user_id == User.id)
+        .where(Student.group_id == group_id)
+        .order_by(Student.id)
+    )
+
+
+def group_students(db: Session, group_id: int) -> list[tuple[int, str]]:
+    return db.execute(_students_query(group_id)).all()
+
+
+def _attendance_query(group_id: int, discipline_id: int, day_list: list[date]) -> Select:
+    return (
+        select(AttendanceRecord.student_id, AttendanceRecord.day, AttendanceRecord.status)
+        .join(Student, AttendanceRecord.student_id == Student.id)
+        .where(Student.group_id == group_id)
+        .where(AttendanceRecord.discipline_id == discipline_id)
+        .where(AttendanceRecord.day.in_(set(day_list)))
+    )
+
+
+def _topics_query(discipline_id: int) -> Select:
+    return select(Topic.id, Topic.title).where(Topic.discipline_id == discipline_id).order_by(Topic.order_index)
+
+
+def _grades_query(group_id: int, discipline_id: int) -> Select:
+    return (
+        select(GradeRecord.student_id, GradeRecord.topic_id, GradeRecord.points, GradeRecord.max_points)
+        .join(Student, GradeRecord.student_id == Student.id)
+        .where(Student.group_id == group_id)
+        .where(GradeRecord.discipline_id == discipline_id)
+    )
+
+
+# The pivots are plain CPU work over fetched rows; the async stack runs them in
+# the threadpool so a large journal does not hold up the event loop.
+def pivot_attendance_journal(students: list, records: Iterable, day_list: list[date]) -> dict:
+    cells = {(student_id, day): status for student_id, day, status in records}
+    keys = [(d, d.isoformat()) for d in day_list]
+    rows = [
+        {
+            "student": {"id": student_id, "full_name": full_name or ""},
+            "statuses": {iso: cells.get((student_id, d), NOT_SET) for d, iso in keys},
+        }
+        for student_id, full_name in students
+    ]
+
+    return {"days": day_list, "rows": rows}
+
+
+def pivot_grades_journal(topics: list, students: list, records: Iterable) -> dict:
+    cells = {
+        (student_id, topic_id): f"{points}/{max_points}"
+        for student_id, topic_id, points, max_points in records
+    }
+    keys = [(topic_id, str(topic_id)) for topic_id, _ in topics]
+    rows = [
+        {
+            "student": {"id": student_id, "full_name": full_name or ""},
+            "points": {key: cells.get((student_id, topic_id), NOT_SET) for topic_id, key in keys},
+        }
+        for student_id, full_name in students
+    ]
+
+    return {
+        "topics": [{"topic_id": topic_id, "title": title, "max_points": 5} for topic_id, title in topics],
+        "rows": rows,
+    }
+
+
+def build_attendance_journal(db: Session, group_id: int, discipline_id: int, day_list: list[date]) -> dict:
+    students = group_students(db, group_id)
+    records = []
+    if students and day_list:
+        records = db.execute(_attendance_query(group_id, discipline_id, day_list)).all()
+    return pivot_attendance_journal(students, records, day_list)
+
+
+def build_grades_journal(db: Session, group_id: int, discipline_id: int) -> dict:
+    topics = db.execute(_topics_query(discipline_id)).all()
+    students = group_students(db, group_id)
+    records = []
+    if topics and students:
+        records = db.execute(_grades_query(group_id, discipline_id)).all()
+    return pivot_grades_journal(topics, students, records)
+
+
+# Same queries as the builders above, returning the pivots' inputs. Async
+# drivers buffer every row at execute time, so the record results are handed
+# over unread: turning raw rows into typed values (dates, on SQLite) is the
+# bulk of the work and happens in the pivot, off the event loop.
+async def fetch_attendance_journal(
+    db: AsyncSession, group_id: int, discipline_id: int, day_list: list[date]
+) -> tuple[list, Iterable]:
+    students = (await db.execute(_students_query(group_id))).all()
+    records = []
+    if students and day_list:
+        records = await db.execute(_attendance_query(group_id, discipline_id, day_list))
+    return students, records
+
+
+async def fetch_grades_journal(db: AsyncSession, group_id: int, discipline_id: int) -> tuple[list, list, Iterable]:
+    topics = (await db.execute(_topics_query(discipline_id))).all()
+    students = (await db.execute(_students_query(group_id))).all()
+    records = []
+    if topics and students:
+        records = await db.execute(_grades_query(group_id, discipline_id))
+    return topics, students, records
@@ -0,0 +1,128 @@
+import csv
+import io
+import itertools
+import tempfile
+from datetime import date
+from typing import Callable, Iterator
+
+from sqlalchemy import and_, select, union
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.journal_engine import NOT_SET
+from app.models import AttendanceRecord, GradeRecord, Group, ScheduleItem, Student, Topic, User
+
+# Exports walk students in (group, student) order with their cells outer-joined,
+# through a server-side cursor, and emit one finished line per student. Only
+# the column list and the current student's cells are ever held in memory.
+
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def _students(discipline_id: int, group_id: int | None):
+    stmt = (
+        select(Group.name, Student.id, User.full_name)
+        .join(Student, Student.group_id == Group.id)
+        .join(User, Student.user_id == User.id)
+    )
+    if group_id is not None:
+        return stmt.where(Group.id == group_id)
+    # Faculty-wide: every group that has this discipline on its schedule.
+    return stmt.where(Group.id.in_(select(ScheduleItem.group_id).where(ScheduleItem.discipline_id == discipline_id)))
+
+
+def _pivot(db: Session, stmt, columns: list, cell: Callable[[tuple], tuple]) -> Iterator[list]:
+    # stmt yields (group, student_id, full_name, *cell columns), ordered by student;
+    # cell() maps the trailing columns to (column key, rendered value).
+    rows = db.execute(stmt.execution_options(yield_per=YIELD_PER))
+    for (group_name, student_id, full_name), records in itertools.groupby(rows, key=lambda r: tuple(r[:3])):
+        values = dict(cell(tuple(r[3:])) for r in records if r[3] is not None)
+        yield [group_name, student_id, full_name or "", *(values.get(c, NOT_SET) for c in columns)]
+
+
+def attendance_rows(db: Session, discipline_id: int, group_id: int | None, start: date, end: date) -> Iterator[list]:
+    in_range = and_(AttendanceRecord.day >= start, AttendanceRecord.day <= end)
+    scheduled = select(ScheduleItem.day).where(
+        ScheduleItem.discipline_id == discipline_id, ScheduleItem.day >= start, ScheduleItem.day <= end
+    )
+    recorded = select(AttendanceRecord.day).where(AttendanceRecord.discipline_id == discipline_id, in_range)
+    if group_id is not None:
+        scheduled = scheduled.where(ScheduleItem.group_id == group_id)
+        recorded = recorded.join(Student, AttendanceRecord.student_id == Student.id).where(Student.group_id == group_id)
+    days = sorted(db.execute(union(scheduled, recorded)).scalars())
+    yield ["Группа", "ID", "Студент", *(d.isoformat() for d in days)]
+
+    stmt = (
+        _students(discipline_id, group_id)
+        .add_columns(AttendanceRecord.day, AttendanceRecord.status)
+        .outerjoin(
+            AttendanceRecord,
+            and_(
+                AttendanceRecord.student_id == Student.id,
+                AttendanceRecord.discipline_id == discipline_id,
+                in_range,
+            ),
+        )
+        .order_by(Group.name, Student.id)
+    )
+    yield from _pivot(db, stmt, days, lambda r: r)
+
+
+def grades_rows(db: Session, discipline_id: int, group_id: int | None) -> Iterator[list]:
+    topics = db.execute(
+        select(Topic.id, Topic.title).where(Topic.discipline_id == discipline_id).order_by(Topic.order_index)
+    ).all()
+    yield ["Группа", "ID", "Студент", *(title for _, title in topics)]
+
+    stmt = (
+        _students(discipline_id, group_id)
+        .add_columns(GradeRecord.topic_id, GradeRecord.points, GradeRecord.max_points)
+        .outerjoin(
+            GradeRecord,
+            and_(GradeRecord.student_id == Student.id, GradeRecord.discipline_id == discipline_id),
+        )
+        .order_by(Group.name, Student.id)
+    )
+    yield from _pivot(db, stmt, [topic_id for topic_id, _ in topics], lambda r: (r[0], f"{r[1]}/{r[2]}"))
+
+
+def csv_chunks(rows: Iterator[list]) -> Iterator[bytes]:
+    # UTF-8 with BOM so Excel opens Cyrillic text correctly.
+    buf = io.StringIO()
+    buf.write("\ufeff")
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode()
+
+
+def xlsx_chunks(rows: Iterator[list], sheet: str) -> Iterator[bytes]:
+    # XLSX is a zip assembled on close, so rows are flushed to disk by
+    # XlsxWriter's constant_memory mode and the finished file is streamed.
+    import xlsxwriter
+
+    with tempfile.TemporaryFile() as out:
+        workbook = xlsxwriter.Workbook(out, {"constant_memory": True})
+        worksheet = workbook.add_worksheet(sheet)
+        for i, row in enumerate(rows):
+            worksheet.write_row(i, 0, row)
+        workbook.close()
+        out.seek(0)
+        while chunk := out.read(CHUNK_BYTES):
+            yield chunk
+
+
+def stream_export(rows: Callable[[Session], Iterator[list]], fmt: str, sheet: str) -> Iterator[bytes]:
+    # The request's session is closed before the body is sent, so the stream
+    # owns its own session for as long as the client is reading.
+    db = SessionLocal()
+    try:
+        chunks = csv_chunks(rows(db)) if fmt == "csv" else xlsx_chunks(rows(db), sheet)
+        yield from chunks
+    finally:
+        db.close()
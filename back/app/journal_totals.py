@@ -0,0 +1,176 @@
+from datetime import datetime
+
+from sqlalchemy import Select, case, func, literal, select, tuple_, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.journal_engine import NOT_SET
+from app.models import (
+    Assignment,
+    AssignmentSubmission,
+    AttendanceRecord,
+    Discipline,
+    GradeRecord,
+    Student,
+    StudentDisciplineTotal,
+    User,
+)
+from app.upsert import upsert_insert
+
+PRESENT = "присутствовал"
+ABSENT = "отсутствовал"
+GRADED = "проверено"
+
+# Totals are recomputed per affected (student, discipline) key inside the
+# writing transaction: one INSERT .. SELECT over the key's cells, which the
+# unique indexes on grade/attendance/submission rows keep to an index range.
+# Every submission contributes a row (zero unless graded), so a key whose
+# grade is withdrawn by a resubmission is still rewritten.
+
+
+def _cells(pairs: set[tuple[int, int]] | None) -> Select:
+    zero = literal(0)
+    grades = select(
+        GradeRecord.student_id,
+        GradeRecord.discipline_id,
+        GradeRecord.points.label("grade_points"),
+        zero.label("submission_points"),
+        zero.label("present"),
+        zero.label("absent"),
+        zero.label("marked"),
+    )
+    attendance = select(
+        AttendanceRecord.student_id,
+        AttendanceRecord.discipline_id,
+        zero,
+        zero,
+        case((AttendanceRecord.status == PRESENT, 1), else_=0),
+        case((AttendanceRecord.status == ABSENT, 1), else_=0),
+        case((AttendanceRecord.status == NOT_SET, 0), else_=1),
+    )
+    submissions = select(
+        AssignmentSubmission.student_id,
+        Assignment.discipline_id,
+        zero,
+        case((AssignmentSubmission.status == GRADED, AssignmentSubmission.points), else_=0),
+        zero,
+        zero,
+        zero,
+    ).join(Assignment, AssignmentSubmission.assignment_id == Assignment.id)
+
+    if pairs is not None:
+        grades = grades.where(tuple_(GradeRecord.student_id, GradeRecord.discipline_id).in_(pairs))
+        attendance = attendance.where(tuple_(AttendanceRecord.student_id, AttendanceRecord.discipline_id).in_(pairs))
+        submissions = submissions.where(tuple_(AssignmentSubmission.student_id, Assignment.discipline_id).in_(pairs))
+    return union_all(grades, attendance, submissions).subquery("cells")
+
+
+TOTAL_COLUMNS = [
+    "student_id",
+    "discipline_id",
+    "grade_points",
+    "submission_points",
+    "present_count",
+    "absent_count",
+    "marked_count",
+    "updated_at",
+]
+
+
+def _lock_keys(conn: Connection, pairs: set[tuple[int, int]], now: datetime) -> None:
+    # A key's totals row doubles as its lock. Under READ COMMITTED, a writer
+    # whose recompute started before a concurrent writer committed would not
+    # see that writer's cells and would overwrite its contribution. Creating
+    # the rows and locking them in key order first makes writers to one key
+    # take turns, and the recompute then runs in a snapshot that sees the
+    # previous writer's commit.
+    keys = sorted(pairs)
+    zero = dict.fromkeys(TOTAL_COLUMNS[2:-1], 0)
+    rows = [{"student_id": s, "discipline_id": d, **zero, "updated_at": now} for s, d in keys]
+    t = StudentDisciplineTotal
+    stmt = upsert_insert(conn, t).values(rows)
+    conn.execute(stmt.on_conflict_do_nothing(index_elements=["student_id", "discipline_id"]))
+
+    conn.execute(
+        select(t.student_id)
+        .where(tuple_(t.student_id, t.discipline_id).in_(keys))
+        .order_by(t.student_id, t.discipline_id)
+        .with_for_update()
+    )
+
+
+def refresh_totals(conn: Connection, pairs: set[tuple[int, int]] | None = None) -> None:
+    # pairs=None rebuilds every key (seeding, bulk generation).
+    if pairs is not None and not pairs:
+        return
+
+    now = datetime.utcnow()
+    if pairs is not None:
+        _lock_keys(conn, pairs, now)
+
+    cells = _cells(pairs)
+    rows = select(
+        cells.c.student_id,
+        cells.c.discipline_id,
+        func.sum(cells.c.grade_points),
+        func.sum(cells.c.submission_points),
+        func.sum(cells.c.present),
+        func.sum(cells.c.absent),
+        func.sum(cells.c.marked),
+        literal(now),
+    ).group_by(cells.c.student_id, cells.c.discipline_id).order_by(cells.c.student_id, cells.c.discipline_id)
+
+    stmt = upsert_insert(conn, StudentDisciplineTotal).from_select(TOTAL_COLUMNS, rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["student_id", "discipline_id"],
+        set_={c: stmt.excluded[c] for c in TOTAL_COLUMNS[2:]},
+    )
+    conn.execute(stmt)
+
+
+def load_totals(
+    db: Session,
+    group_id: int | None = None,
+    student_id: int | None = None,
+    discipline_id: int | None = None,
+) -> list[dict]:
+    t = StudentDisciplineTotal
+    stmt = (
+        select(
+            t.student_id,
+            User.full_name,
+            t.discipline_id,
+            Discipline.title,
+            t.grade_points + t.submission_points,
+            Discipline.max_points,
+            t.present_count,
+            t.absent_count,
+            t.marked_count,
+        )
+        .join(Student, t.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+        .join(Discipline, t.discipline_id == Discipline.id)
+        .order_by(t.student_id, t.discipline_id)
+    )
+    if group_id is not None:
+        stmt = stmt.where(Student.group_id == group_id)
+    if student_id is not None:
+        stmt = stmt.where(t.student_id == student_id)
+    if discipline_id is not None:
+        stmt = stmt.where(t.discipline_id == discipline_id)
+
+    return [
+        {
+            "student_id": sid,
+            "full_name": full_name or "",
+            "discipline_id": did,
+            "discipline_title": title,
+            "points": points,
+            "max_points": max_points,
+            "present": present,
+            "absent": absent,
+            "marked": marked,
+            "attendance_rate": round(present / marked, 4) if marked else None,
+        }
+        for sid, full_name, did, title, points, max_points, present, absent, marked in db.execute(stmt)
+    ]
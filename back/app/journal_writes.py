@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db import Base
+from app.journal_totals import refresh_totals
+from app.models import AttendanceRecord, Discipline, GradeRecord, Student, Topic
+from app.upsert import upsert_insert
+
+ATTENDANCE_KEY = ("student_id", "discipline_id", "day")
+GRADE_KEY = ("student_id", "discipline_id", "topic_id")
+
+REFERENCES = {
+    "student_id": (Student, "Unknown student"),
+    "discipline_id": (Discipline, "Unknown discipline"),
+    "topic_id": (Topic, "Unknown topic"),
+}
+
+
+def missing_references(db: Session, rows: list[dict]) -> list[str | None]:
+    # One round trip for every id the rows point at, so an unknown id rejects
+    # its own cell rather than failing the batch on a foreign key (or, on
+    # SQLite, being written as is).
+    if not rows:
+        return []
+    columns = [c for c in REFERENCES if c in rows[0]]
+    lookups = [
+        select(literal(c).label("ref"), REFERENCES[c][0].id).where(REFERENCES[c][0].id.in_({r[c] for r in rows}))
+        for c in columns
+    ]
+    found = set(db.execute(union_all(*lookups)).tuples())
+    return [next((REFERENCES[c][1] for c in columns if (c, r[c]) not in found), None) for r in rows]
+
+
+def _upsert(
+    db: Session,
+    model: type[Base],
+    key: tuple[str, ...],
+    rows: list[dict],
+    update: tuple[str, ...],
+) -> dict[tuple, int]:
+    if not rows:
+        return {}
+
+    # Last write wins for repeated cells: ON CONFLICT cannot touch the same row twice in one statement.
+    # Rows go out in key order so concurrent writers over overlapping cells take
+    # their row locks in the same order and cannot deadlock.
+    unique = {tuple(r[k] for k in key): r for r in rows}
+    values = [unique[k] for k in sorted(unique)]
+
+    stmt = upsert_insert(db.connection(), model).values(values)
+    stmt = stmt.on_conflict_do_update(index_elements=list(key), set_={c: stmt.excluded[c] for c in update})
+
+    cols = [getattr(model, k) for k in key]
+    returned = db.execute(stmt.returning(model.id, *cols)).all()
+    return {tuple(r[1:]): r[0] for r in returned}
+
+
+def upsert_attendance_rows(db: Session, rows: list[dict]) -> dict[tuple, int]:
+    now = datetime.utcnow()
+    ids = _upsert(
+        db,
+        AttendanceRecord,
+        ATTENDANCE_KEY,
+        [{**r, "updated_at": now} for r in rows],
+        ("status", "updated_at"),
+    )
+    refresh_totals(db.connection(), {(r["student_id"], r["discipline_id"]) for r in rows})
+    return ids
+
+
+def upsert_grade_rows(db: Session, rows: list[dict]) -> dict[tuple, int]:
+    now = datetime.utcnow()
+    ids = _upsert(
+        db,
+        GradeRecord,
+        GRADE_KEY,
+        [{**r, "updated_at": now} for r in rows],
+        ("points", "max_points", "updated_at"),
+    )
+    refresh_totals(db.connection(), {(r["student_id"], r["discipline_id"]) for r in rows})
+    return ids
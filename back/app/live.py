@@ -0,0 +1,145 @@
+import asyncio
+import threading
+from typing import Callable, Protocol
+
+from app.config import settings
+from app.fastjson import dumps
+from app.metrics import LIVE_DROPPED, LIVE_SUBSCRIBERS
+from app.response_cache import journal_scope
+
+# Writers publish ready-made SSE frames to a bus after commit; every worker's
+# hub receives them and fans each frame out to the queues of its local
+# subscribers on that (group, discipline) channel. Publishing happens on
+# threadpool threads (or the bus listener thread), so delivery onto the event
+# loop goes through call_soon_threadsafe. A subscriber whose queue is full is
+# dropped rather than buffered without bound; EventSource reconnects and the
+# client refetches the journal.
+
+Deliver = Callable[[str, bytes], None]
+
+
+class LiveBus(Protocol):
+    def publish(self, channel: str, frame: bytes) -> None: ...
+
+    def listen(self, deliver: Deliver) -> None: ...
+
+
+class LocalBus:
+    # Single-process bus; also stands in for Redis when several hubs share it.
+    def __init__(self):
+        self.listeners: list[Deliver] = []
+
+    def publish(self, channel: str, frame: bytes) -> None:
+        for deliver in self.listeners:
+            deliver(channel, frame)
+
+    def listen(self, deliver: Deliver) -> None:
+        self.listeners.append(deliver)
+
+
+class RedisBus:
+    # Any redis-py style client with publish() and pubsub().
+    def __init__(self, client, prefix: str = "edu:live:"):
+        self.client = client
+        self.prefix = prefix
+
+    def publish(self, channel: str, frame: bytes) -> None:
+        self.client.publish(self.prefix + channel, frame)
+
+    def listen(self, deliver: Deliver) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + "*")
+
+        def run() -> None:
+            for message in pubsub.listen():
+                deliver(message["channel"].decode()[len(self.prefix):], message["data"])
+
+        threading.Thread(target=run, name="live-bus", daemon=True).start()
+
+
+class LiveHub:
+    def __init__(self, bus: LiveBus, queue_size: int):
+        self.bus = bus
+        self.queue_size = queue_size
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.subscribers: dict[str, set[asyncio.Queue]] = {}
+        bus.listen(self.dispatch)
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        self.loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.subscribers.setdefault(channel, set()).add(queue)
+        LIVE_SUBSCRIBERS.inc()
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        queues = self.subscribers.get(channel)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[channel]
+        LIVE_SUBSCRIBERS.dec()
+
+    def publish(self, channel: str, frame: bytes) -> None:
+        self.bus.publish(channel, frame)
+
+    def dispatch(self, channel: str, frame: bytes) -> None:
+        loop = self.loop
+        if loop is None or loop.is_closed() or channel not in self.subscribers:
+            return
+        loop.call_soon_threadsafe(self._fan_out, channel, frame)
+
+    def _fan_out(self, channel: str, frame: bytes) -> None:
+        for queue in list(self.subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.unsubscribe(channel, queue)
+                LIVE_DROPPED.inc()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+class LiveBusMisconfigured(RuntimeError):
+    pass
+
+
+def ensure_bus_reaches_workers() -> None:
+    # A LocalBus only delivers to streams held by the worker that made the write.
+    if settings.web_concurrency > 1 and settings.live_bus_backend != "redis":
+        raise LiveBusMisconfigured(
+            f"WEB_CONCURRENCY={settings.web_concurrency} needs LIVE_BUS_BACKEND=redis; "
+            "the local bus would not reach event streams held by other workers"
+        )
+
+
+def _make_bus() -> LiveBus:
+    if settings.live_bus_backend == "redis":
+        import redis
+
+        return RedisBus(redis.Redis.from_url(settings.live_bus_url))
+    return LocalBus()
+
+
+live_hub = LiveHub(_make_bus(), settings.live_queue_size)
+
+
+def sse_frame(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def publish_cells(event: str, groups: dict[int, int], rows: list[dict]) -> None:
+    # rows are written cells carrying student_id and discipline_id; groups maps
+    # student_id -> group_id. One frame per (group, discipline) channel.
+    channels: dict[tuple[int, int], list[dict]] = {}
+    for row in rows:
+        group_id = groups.get(row["student_id"])
+        if group_id is not None:
+            cell = {k: v for k, v in row.items() if k != "discipline_id"}
+            channels.setdefault((group_id, row["discipline_id"]), []).append(cell)
+
+    for (group_id, discipline_id), cells in channels.items():
+        frame = sse_frame(event, {"group_id": group_id, "discipline_id": discipline_id, "cells": cells})
+        live_hub.publish(journal_scope(group_id, discipline_id), frame)
@@ -1,26 +1,52 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.aio import asyncify_router
 from app.config import settings
-from app.db import Base, engine, SessionLocal
-from app.routers import assignments, auth, disciplines, journal, schedule, topics
+from app.db import Base, async_engine, engine, SessionLocal
+from app.live import ensure_bus_reaches_workers
+from app.metrics import MetricsMiddleware
+from app.migrate import ensure_schema_current
+from app.pagination import NEXT_CURSOR_HEADER
+from app.profiling import ProfilingMiddleware
+from app.routers import assignments, auth, dashboard, disciplines, journal, live, ops, schedule, topics
 from app.seed import seed
+from app.upsert import ensure_upsert_support
+
+logging.basicConfig(level=settings.log_level, format="%(levelname)s %(name)s %(message)s")
 
 app = FastAPI(title="Edu Platform API")
 
+if settings.profile_requests:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[o.strip() for o in settings.cors_origins.split(",") if o.strip()],
     allow_credentials=True,
     allow_methods=["*"] ,
     allow_headers=["*"] ,
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    ensure_upsert_support(engine)
+    ensure_bus_reaches_workers()
 
+    # Schema changes belong to `python -m app.migrate upgrade`; workers only
+    # verify the revision so a cold start does no DDL or catalog introspection.
+    if settings.schema_on_start == "check":
+        ensure_schema_current(engine)
+    elif settings.schema_on_start == "create_all":
+        Base.metadata.create_all(bind=engine)
+
+    # Seeding is `python -m app.migrate seed`; this is only for a single
+    # worker, since concurrent workers would all seed an empty database.
     if settings.seed_on_start:
         db = SessionLocal()
         try:
@@ -29,9 +55,19 @@ def on_startup():
             db.close()
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    # aiosqlite keeps a non-daemon thread per connection, so an undisposed
+    # async pool blocks interpreter exit.
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app.include_router(ops.router)
 app.include_router(auth.router)
-app.include_router(disciplines.router)
-app.include_router(schedule.router)
-app.include_router(journal.router)
-app.include_router(topics.router)
-app.include_router(assignments.router)
+app.include_router(live.router)
+for module in (dashboard, disciplines, schedule, journal, topics, assignments):
+    if settings.db_async:
+        app.include_router(asyncify_router(module.router, getattr(module, "async_router", None)))
+    else:
+        app.include_router(module.router)
@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from typing import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Hot-path updates are plain attribute increments without a lock. Under the GIL
+# a concurrent update can very rarely be lost, which is acceptable for
+# monitoring and keeps instrumentation out of request latency. Locks are only
+# taken when a new label combination is created.
+
+Sample = tuple[str, dict[str, str], float]
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative = []
+        running = 0
+        for bound, n in zip((*self.buckets, float("inf")), self.counts):
+            running += n
+            cumulative.append(("+Inf" if bound == float("inf") else bound, running))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+    def samples(self, name: str, labels: dict[str, str]) -> list[Sample]:
+        snap = self.snapshot()
+        out = [(f"{name}_bucket", {**labels, "le": str(bound)}, n) for bound, n in snap["buckets"]]
+        out.append((f"{name}_sum", labels, snap["sum"]))
+        out.append((f"{name}_count", labels, snap["count"]))
+        return out
+
+
+class Value:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Metric:
+    def __init__(self, name: str, help: str, kind: str, labelnames: tuple[str, ...] = (), factory=Value):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not labelnames:
+            self._children[()] = factory()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def inc(self, amount: float = 1) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._children[()].dec(amount)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def samples(self) -> list[Sample]:
+        out: list[Sample] = []
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            if isinstance(child, Histogram):
+                out.extend(child.samples(self.name, labels))
+            else:
+                out.append((self.name, labels, child.value))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]] = []
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._add(Metric(name, help, "counter", labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._add(Metric(name, help, "gauge", labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Metric:
+        return self._add(Metric(name, help, "histogram", labelnames, factory=lambda: Histogram(buckets)))
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]) -> None:
+        # A collector yields (name, help, kind, samples) at scrape time, for
+        # values that already live elsewhere (pool state, cache counters).
+        self._collectors.append(collector)
+
+    def _add(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        families = [(m.name, m.help, m.kind, m.samples()) for m in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines: list[str] = []
+        for name, help, kind, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                if labels:
+                    rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    lines.append(f"{sample_name}{{{rendered}}} {_format(value)}")
+                else:
+                    lines.append(f"{sample_name} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being served")
+PASSWORD_VERIFY = REGISTRY.histogram(
+    "password_verify_seconds",
+    "bcrypt password verification duration",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+JWT_DECODE_FAILURES = REGISTRY.counter("jwt_decode_failures_total", "Bearer tokens that failed verification")
+LIVE_SUBSCRIBERS = REGISTRY.gauge("live_subscribers", "Open live event streams on this worker")
+LIVE_DROPPED = REGISTRY.counter("live_dropped_subscribers_total", "Live event streams closed for falling behind")
+
+
+def is_event_stream(message: Message) -> bool:
+    return any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message.get("headers", ()))
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+        done = False
+
+        def finish() -> None:
+            nonlocal done
+            done = True
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, template).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, template, str(status)).inc()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # An event stream stays open for as long as the client watches;
+                # it is recorded once its headers go out and tracked by
+                # live_subscribers from then on.
+                if is_event_stream(message):
+                    finish()
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if not done:
+                finish()
@@ -0,0 +1,92 @@
+import argparse
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+@lru_cache
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(engine: Engine) -> str | None:
+    # A plain SELECT instead of alembic's MigrationContext, which inspects the
+    # catalog for the version table first.
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+
+def ensure_schema_current(engine: Engine) -> None:
+    current = current_revision(engine)
+    head = head_revision()
+    if current != head:
+        raise SchemaOutOfDate(
+            f"Database schema is at {current or 'no revision'}, expected {head}; "
+            "run `python -m app.migrate upgrade`"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("upgrade", help="apply migrations")
+    p.add_argument("revision", nargs="?", default="head")
+    p = sub.add_parser("downgrade", help="revert migrations")
+    p.add_argument("revision")
+    p = sub.add_parser("stamp", help="record a revision without running it")
+    p.add_argument("revision")
+    sub.add_parser("current", help="show the database revision")
+    sub.add_parser("check", help="exit non-zero if the database is not at head")
+    sub.add_parser("seed", help="load demo data into an empty database")
+    args = parser.parse_args(argv)
+
+    cfg = alembic_config()
+    if args.cmd == "upgrade":
+        command.upgrade(cfg, args.revision)
+    elif args.cmd == "downgrade":
+        command.downgrade(cfg, args.revision)
+    elif args.cmd == "stamp":
+        command.stamp(cfg, args.revision)
+    elif args.cmd == "seed":
+        from app.db import SessionLocal, engine
+        from app.seed import seed
+        from app.upsert import ensure_upsert_support
+
+        ensure_upsert_support(engine)
+        db = SessionLocal()
+        try:
+            seed(db)
+        finally:
+            db.close()
+    else:
+        from app.db import engine
+
+        current = current_revision(engine)
+        print(f"current: {current or '-'}  head: {head_revision()}")
+        if args.cmd == "check" and current != head_revision():
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
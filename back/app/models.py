@@ -1,6 +1,6 @@
 from datetime import date, datetime, time
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, String, Time, UniqueConstraint
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Integer, String, Time, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
@@ -45,7 +45,7 @@ class Student(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), unique=True)
-    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id"))
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id"), index=True)
 
     user: Mapped[User] = relationship(back_populates="student_profile")
     group: Mapped[Group] = relationship(back_populates="students")
@@ -56,7 +56,7 @@ class Discipline(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(255))
-    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id"))
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id"), index=True)
     max_points: Mapped[int] = mapped_column(Integer, default=100)
     hours_total: Mapped[int] = mapped_column(Integer, default=56)
 
@@ -67,6 +67,7 @@ class Discipline(Base):
 
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (Index("ix_topics_discipline_order", "discipline_id", "order_index"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     discipline_id: Mapped[int] = mapped_column(ForeignKey("disciplines.id"))
@@ -80,6 +81,7 @@ class Topic(Base):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (Index("ix_assignments_discipline_id", "discipline_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     topic_id: Mapped[int] = mapped_column(ForeignKey("topics.id"))
@@ -93,7 +95,10 @@ class Assignment(Base):
 
 class AssignmentSubmission(Base):
     __tablename__ = "assignment_submissions"
-    __table_args__ = (UniqueConstraint("student_id", "assignment_id", name="uq_assignment_submission"),)
+    __table_args__ = (
+        UniqueConstraint("student_id", "assignment_id", name="uq_assignment_submission"),
+        Index("ix_assignment_submissions_assignment_student", "assignment_id", "student_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     student_id: Mapped[int] = mapped_column(ForeignKey("students.id"))
@@ -102,11 +107,15 @@ class AssignmentSubmission(Base):
     status: Mapped[str] = mapped_column(String(32), default="не сдано")
     points: Mapped[int] = mapped_column(Integer, default=0)
     max_points: Mapped[int] = mapped_column(Integer, default=10)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class ScheduleItem(Base):
     __tablename__ = "schedule_items"
+    __table_args__ = (
+        Index("ix_schedule_items_day_start", "day", "start_time", "id"),
+        Index("ix_schedule_items_group_day", "group_id", "day", "start_time", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     discipline_id: Mapped[int] = mapped_column(ForeignKey("disciplines.id"))
@@ -129,7 +138,7 @@ class AttendanceRecord(Base):
     discipline_id: Mapped[int] = mapped_column(ForeignKey("disciplines.id"))
     day: Mapped[date] = mapped_column(Date)
     status: Mapped[str] = mapped_column(String(32))
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
 class GradeRecord(Base):
@@ -142,4 +151,24 @@ class GradeRecord(Base):
     topic_id: Mapped[int] = mapped_column(ForeignKey("topics.id"))
     points: Mapped[int] = mapped_column(Integer, default=0)
     max_points: Mapped[int] = mapped_column(Integer, default=5)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StudentDisciplineTotal(Base):
+    __tablename__ = "student_discipline_totals"
+
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id"), primary_key=True)
+    discipline_id: Mapped[int] = mapped_column(ForeignKey("disciplines.id"), primary_key=True)
+    grade_points: Mapped[int] = mapped_column(Integer, default=0)
+    submission_points: Mapped[int] = mapped_column(Integer, default=0)
+    present_count: Mapped[int] = mapped_column(Integer, default=0)
+    absent_count: Mapped[int] = mapped_column(Integer, default=0)
+    marked_count: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
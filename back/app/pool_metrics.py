@@ -0,0 +1,79 @@
+import time
+from typing import Callable
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.metrics import REGISTRY, Histogram
+
+
+class PoolStats:
+    def __init__(self):
+        self.wait_seconds = Histogram()
+        self.checkout_failures = 0
+
+
+class _TimedCheckout:
+    stats: PoolStats
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.checkout_failures += 1
+            raise
+        self.stats.wait_seconds.observe(time.perf_counter() - t0)
+        return conn
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+def pool_snapshot(pool: Pool) -> dict:
+    out = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        out.update(
+            checkout_failures=stats.checkout_failures,
+            wait_seconds=stats.wait_seconds.snapshot(),
+        )
+    return out
+
+
+def register_pool_metrics(pools: dict[str, Callable[[], Pool]]) -> None:
+    def collect():
+        snaps = {name: pool_snapshot(get_pool()) for name, get_pool in pools.items()}
+        for key, help in (
+            ("size", "Configured pool size"),
+            ("checked_out", "Connections currently checked out"),
+            ("checked_in", "Idle connections in the pool"),
+            ("overflow", "Connections opened beyond pool size"),
+        ):
+            yield f"db_pool_{key}", help, "gauge", [
+                (f"db_pool_{key}", {"pool": name}, snap[key]) for name, snap in snaps.items() if key in snap
+            ]
+        yield "db_pool_checkout_failures_total", "Failed connection checkouts", "counter", [
+            ("db_pool_checkout_failures_total", {"pool": name}, snap["checkout_failures"])
+            for name, snap in snaps.items()
+            if "checkout_failures" in snap
+        ]
+        yield "db_pool_wait_seconds", "Time spent waiting for a pooled connection", "histogram", [
+            sample
+            for name, get_pool in pools.items()
+            if getattr(get_pool(), "stats", None) is not None
+            for sample in get_pool().stats.wait_seconds.samples("db_pool_wait_seconds", {"pool": name})
+        ]
+
+    REGISTRY.register_collector(collect)
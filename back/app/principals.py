@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.cache import TTLCache
+from app.config import settings
+from app.models import Student, Teacher, User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    username: str
+    role: str
+    full_name: str
+    student_id: int | None = None
+    group_id: int | None = None
+    teacher_id: int | None = None
+
+
+principal_cache = TTLCache(
+    "principal",
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+def load_principal(db: Session, user_id: int) -> Principal | None:
+    row = db.execute(
+        select(
+            User.id,
+            User.username,
+            User.role,
+            User.full_name,
+            User.is_active,
+            Student.id,
+            Student.group_id,
+            Teacher.id,
+        )
+        .outerjoin(Student, Student.user_id == User.id)
+        .outerjoin(Teacher, Teacher.user_id == User.id)
+        .where(User.id == user_id)
+    ).first()
+    if not row or not row[4]:
+        return None
+
+    return Principal(
+        id=row[0],
+        username=row[1],
+        role=row[2],
+        full_name=row[3],
+        student_id=row[5],
+        group_id=row[6],
+        teacher_id=row[7],
+    )
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.pop(user_id)
+
+
+# Identity changes are dropped from the cache once they are committed, so a
+# concurrent request cannot re-cache the old row between flush and commit.
+def _mark_stale(target, user_id: int) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    _mark_stale(target, target.id)
+
+
+@event.listens_for(Student, "after_insert")
+@event.listens_for(Student, "after_update")
+@event.listens_for(Student, "after_delete")
+@event.listens_for(Teacher, "after_insert")
+@event.listens_for(Teacher, "after_update")
+@event.listens_for(Teacher, "after_delete")
+def _profile_changed(mapper, connection, target: Student | Teacher) -> None:
+    _mark_stale(target, target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_stale(session: Session) -> None:
+    for user_id in session.info.pop("stale_principals", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale(session: Session) -> None:
+    session.info.pop("stale_principals", None)
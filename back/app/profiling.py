@@ -0,0 +1,129 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.metrics import is_event_stream
+
+logger = logging.getLogger("app.profiling")
+
+
+@dataclass
+class RequestProfile:
+    statements: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_sql: str | None = None
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries", '
+            f"app;dur={total_seconds * 1000:.1f}"
+        )
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> RequestProfile | None:
+    return _current.get()
+
+
+# Listening on the Engine class covers the sync engine and the async engine's
+# sync facade alike. Threadpool and run_sync calls inherit the request context.
+# The start time rides on the execution context so a failed statement cannot
+# leave a stale entry on the pooled connection.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._profile_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    profile.statements += 1
+    profile.db_seconds += elapsed
+    if elapsed > profile.slowest_seconds:
+        profile.slowest_seconds = elapsed
+        profile.slowest_sql = statement
+
+    if elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "ms": round(elapsed * 1000, 1),
+                    "sql": " ".join(statement.split()),
+                    "params": repr(parameters)[:2000],
+                },
+                ensure_ascii=False,
+            )
+        )
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        status = 500
+
+        logged = False
+
+        def log() -> None:
+            nonlocal logged
+            logged = True
+            route = scope.get("route")
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request",
+                        "method": scope["method"],
+                        "route": getattr(route, "path", scope["path"]),
+                        "status": status,
+                        "ms": round((time.perf_counter() - started) * 1000, 1),
+                        "db_ms": round(profile.db_seconds * 1000, 1),
+                        "statements": profile.statements,
+                        "slowest_ms": round(profile.slowest_seconds * 1000, 1),
+                    }
+                )
+            )
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", profile.server_timing(time.perf_counter() - started)
+                )
+                # Event streams are logged when they open, not hours later when they close.
+                if is_event_stream(message):
+                    log()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if not logged:
+                log()
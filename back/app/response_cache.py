@@ -0,0 +1,318 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Protocol
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.cache import CACHES
+from app.conditional import conditional_headers, etag_matches, make_etag
+from app.config import settings
+from app.fastjson import dumps
+from app.models import Student
+
+# Entries are keyed by the request parameters plus the current generation of
+# every scope they depend on. Writers bump a scope's generation after commit
+# instead of deleting keys, so invalidation is one counter update no matter how
+# many variants (day lists, pages) are cached, and superseded entries simply
+# age out of the LRU. Readers fetch generations before touching the database,
+# so a response built from pre-commit data is always stored under a stale key.
+
+
+class CacheBackend(Protocol):
+    shared: bool
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    def generations(self, scopes: list[str]) -> list[int]: ...
+
+    def bump(self, scopes: list[str]) -> None: ...
+
+
+class LocalBackend:
+    # Per-worker store bounded by payload bytes. Generations only count this
+    # worker's writes, so entries are revalidated against the database before
+    # use (see ResponseCache.resolve) and the TTL merely retires old entries.
+    shared = False
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._data: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.monotonic():
+                del self._data[key]
+                self.bytes -= len(item[0])
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old[0])
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self.bytes += len(value)
+            while self.bytes > self.max_bytes:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def generations(self, scopes: list[str]) -> list[int]:
+        return [self._generations.get(scope, 0) for scope in scopes]
+
+    def bump(self, scopes: list[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+
+class NullBackend:
+    # Stores nothing, so every request builds its response. For benchmarks
+    # that must measure the handlers, and RESPONSE_CACHE_BACKEND=none.
+    shared = False
+
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    def generations(self, scopes: list[str]) -> list[int]:
+        return [0] * len(scopes)
+
+    def bump(self, scopes: list[str]) -> None:
+        pass
+
+
+class RedisBackend:
+    # Shared between workers. Works with any client exposing the redis-py
+    # get/set/mget/incr calls; eviction is left to the server's maxmemory
+    # policy, with the TTL clearing out superseded generations.
+    shared = True
+
+    def __init__(self, client, ttl: int, prefix: str = "edu:rc:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def generations(self, scopes: list[str]) -> list[int]:
+        return [int(v or 0) for v in self.client.mget([f"{self.prefix}gen:{s}" for s in scopes])]
+
+    def bump(self, scopes: list[str]) -> None:
+        for scope in scopes:
+            self.client.incr(f"{self.prefix}gen:{scope}")
+
+
+class FakeRedis:
+    # In-process stand-in for the redis-py client, for tests and benchmarks
+    # that need several workers' caches to share one store.
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (item[1] is not None and item[1] <= time.monotonic()):
+                self._data.pop(key, None)
+                return None
+            return item[0]
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.get(key) for key in keys]
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._data.get(key, (b"0", None))[0]) + 1
+            self._data[key] = (str(value).encode(), None)
+            return value
+
+
+def _split_entry(cached: bytes | None) -> tuple[str | None, bytes | None]:
+    if cached is None:
+        return None, None
+    raw_etag, body = cached.split(b"\n", 1)
+    return raw_etag.decode(), body
+
+
+class ResponseCache:
+    def __init__(self, name: str, backend: CacheBackend):
+        self.name = name
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        CACHES[name] = self
+
+    def lookup(self, scopes: list[str], *parts) -> tuple[str, bytes | None]:
+        generations = self.backend.generations(scopes)
+        key = hashlib.blake2b(repr((parts, scopes, generations)).encode(), digest_size=16).hexdigest()
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return key, value
+
+    def resolve(self, scopes: list[str], parts: tuple, validator: Callable[[], tuple]) -> tuple[str, str, bytes | None]:
+        # Returns (key, etag, body); body is None when the response has to be
+        # built and stored under key. Entries in a per-worker backend may
+        # predate another worker's write, so they are only served while the
+        # validator still produces their etag.
+        key, cached = self.lookup(scopes, *parts)
+        etag, body = _split_entry(cached)
+        if etag is None or not self.backend.shared:
+            etag, body = self._revalidate(etag, body, make_etag(*validator()))
+        return key, etag, body
+
+    async def resolve_async(
+        self, scopes: list[str], parts: tuple, validator: Callable[[], Awaitable[tuple]]
+    ) -> tuple[str, str, bytes | None]:
+        # Shared backends talk to the network, which stays off the event loop.
+        if self.backend.shared:
+            key, cached = await run_in_threadpool(self.lookup, scopes, *parts)
+        else:
+            key, cached = self.lookup(scopes, *parts)
+        etag, body = _split_entry(cached)
+        if etag is None or not self.backend.shared:
+            etag, body = self._revalidate(etag, body, make_etag(*await validator()))
+        return key, etag, body
+
+    def _revalidate(self, etag: str | None, body: bytes | None, current: str) -> tuple[str, bytes | None]:
+        if current == etag:
+            return etag, body
+        if etag is not None:
+            self.hits -= 1
+            self.misses += 1
+        return current, None
+
+    def store(self, key: str, value: bytes) -> None:
+        self.backend.set(key, value)
+
+    def invalidate(self, scopes: list[str]) -> None:
+        if scopes:
+            self.backend.bump(scopes)
+
+    def stats(self) -> dict[str, int]:
+        stats = {"hits": self.hits, "misses": self.misses}
+        if isinstance(self.backend, LocalBackend):
+            stats.update(size=len(self.backend), bytes=self.backend.bytes)
+        else:
+            stats["size"] = 0
+        return stats
+
+
+def _make_backend() -> CacheBackend:
+    if settings.response_cache_backend == "redis":
+        import redis
+
+        return RedisBackend(redis.Redis.from_url(settings.response_cache_url), settings.response_cache_ttl_seconds)
+    if settings.response_cache_backend == "none":
+        return NullBackend()
+    if settings.response_cache_backend == "fake":
+        return RedisBackend(FakeRedis(), settings.response_cache_ttl_seconds)
+    return LocalBackend(settings.response_cache_max_bytes, settings.response_cache_ttl_seconds)
+
+
+response_cache = ResponseCache("response", _make_backend())
+
+
+def journal_scope(group_id: int, discipline_id: int) -> str:
+    return f"journal:{group_id}:{discipline_id}"
+
+
+def table_scope(name: str) -> str:
+    return f"table:{name}"
+
+
+def invalidate_journals(db: Session, cells: set[tuple[int, int]]) -> dict[int, int]:
+    # cells are (student_id, discipline_id); journals are cached per group.
+    # Returns the student_id -> group_id map it looked up.
+    if not cells:
+        return {}
+    groups = dict(
+        db.execute(select(Student.id, Student.group_id).where(Student.id.in_({s for s, _ in cells}))).all()
+    )
+    response_cache.invalidate(sorted({journal_scope(groups[s], d) for s, d in cells if s in groups}))
+    return groups
+
+
+def cached_json(
+    request: Request,
+    scopes: list[str],
+    parts: tuple,
+    validator: Callable[[], tuple],
+    build: Callable[[], dict],
+) -> Response:
+    key, etag, body = response_cache.resolve(scopes, parts, validator)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=conditional_headers(etag))
+    if body is None:
+        body = dumps(build())
+        response_cache.store(key, etag.encode() + b"\n" + body)
+    return Response(content=body, media_type="application/json", headers=conditional_headers(etag))
+
+
+async def cached_json_async(
+    request: Request,
+    scopes: list[str],
+    parts: tuple,
+    validator: Callable[[], Awaitable[tuple]],
+    fetch: Callable[[], Awaitable],
+    render: Callable[[Any], dict],
+) -> Response:
+    # cached_json for the async stack: fetch runs the queries on the loop;
+    # render turns its result into the response dict in the threadpool, where
+    # the dict is also encoded.
+    key, etag, body = await response_cache.resolve_async(scopes, parts, validator)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=conditional_headers(etag))
+    if body is None:
+        fetched = await fetch()
+        body = await run_in_threadpool(lambda: dumps(render(fetched)))
+        entry = etag.encode() + b"\n" + body
+        if response_cache.backend.shared:
+            await run_in_threadpool(response_cache.store, key, entry)
+        else:
+            response_cache.store(key, entry)
+    return Response(content=body, media_type="application/json", headers=conditional_headers(etag))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_tables(session: Session) -> None:
+    touched = session.info.pop("touched_tables", ())
+    response_cache.invalidate(sorted(table_scope(name) for name in touched))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_tables(session: Session) -> None:
+    session.info.pop("touched_tables", None)
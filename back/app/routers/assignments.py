@@ -1,52 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.deps import get_current_user, require_role
-from app.models import Assignment, AssignmentSubmission, Student, User
+from app.fastjson import json_response
+from app.journal_totals import GRADED, refresh_totals
+from app.live import publish_cells
+from app.models import Assignment, AssignmentSubmission
+from app.pagination import decode_cursor, page_size, set_next_cursor, split_page
+from app.principals import Principal
+from app.response_cache import invalidate_journals
 from app.schemas import (
     AssignmentGradeIn,
     AssignmentOut,
     AssignmentSubmissionOut,
     AssignmentSubmitIn,
+    BulkCellResult,
+    BulkUpsertOut,
+    SubmissionGradeBulkIn,
+    SubmissionReviewOut,
 )
+from app.submissions import grade_rows, my_submissions, review_queue, submission_cells
 
 router = APIRouter(prefix="/assignments", tags=["assignments"])
 
+REVIEW_STATUS = Query(None, pattern="^(сдано|проверено)$")
+
+
+def _graded_cell(submission_id: int, student_id: int, discipline_id: int, assignment_id: int, points: int) -> dict:
+    return {
+        "student_id": student_id,
+        "discipline_id": discipline_id,
+        "assignment_id": assignment_id,
+        "submission_id": submission_id,
+        "status": GRADED,
+        "points": points,
+    }
+
+
+def _review_page(db: Session, response: Response, status, cursor, limit: int, criterion):
+    after = decode_cursor(cursor, (int, int))
+    items, next_cursor = split_page(
+        review_queue(db, status, after, limit, criterion), limit, lambda r: (r["assignment_id"], r["student_id"])
+    )
+    set_next_cursor(response, next_cursor)
+    return json_response(items, response)
+
 
 @router.get("/by_discipline/{discipline_id}", response_model=list[AssignmentOut])
 def list_assignments_by_discipline(
     discipline_id: int,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Depends(page_size),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    items = (
-        db.execute(select(Assignment).where(Assignment.discipline_id == discipline_id).order_by(Assignment.id))
-        .scalars()
-        .all()
-    )
-    return [
-        AssignmentOut(
-            id=a.id,
-            topic_id=a.topic_id,
-            discipline_id=a.discipline_id,
-            title=a.title,
-            text=a.text,
-            max_points=a.max_points,
+    stmt = (
+        select(
+            Assignment.id,
+            Assignment.topic_id,
+            Assignment.discipline_id,
+            Assignment.title,
+            Assignment.text,
+            Assignment.max_points,
         )
-        for a in items
-    ]
+        .where(Assignment.discipline_id == discipline_id)
+        .order_by(Assignment.id)
+        .limit(limit + 1)
+    )
+    after = decode_cursor(cursor, (int,))
+    if after is not None:
+        stmt = stmt.where(Assignment.id > after[0])
+
+    items, next_cursor = split_page(db.execute(stmt).all(), limit, lambda a: (a.id,))
+    set_next_cursor(response, next_cursor)
+    return json_response([row._asdict() for row in items], response)
+
+
+@router.get(
+    "/by_discipline/{discipline_id}/submissions",
+    response_model=list[SubmissionReviewOut],
+    dependencies=[Depends(require_role("teacher"))],
+)
+def discipline_review_queue(
+    discipline_id: int,
+    response: Response,
+    status: str | None = REVIEW_STATUS,
+    cursor: str | None = None,
+    limit: int = Depends(page_size),
+    db: Session = Depends(get_db),
+):
+    return _review_page(db, response, status, cursor, limit, Assignment.discipline_id == discipline_id)
 
 
-def _get_student_profile(db: Session, user: User) -> Student | None:
-    if user.role != "student":
-        return None
-    return db.execute(select(Student).where(Student.user_id == user.id)).scalar_one_or_none()
+@router.get(
+    "/{assignment_id}/submissions",
+    response_model=list[SubmissionReviewOut],
+    dependencies=[Depends(require_role("teacher"))],
+)
+def assignment_review_queue(
+    assignment_id: int,
+    response: Response,
+    status: str | None = REVIEW_STATUS,
+    cursor: str | None = None,
+    limit: int = Depends(page_size),
+    db: Session = Depends(get_db),
+):
+    return _review_page(db, response, status, cursor, limit, AssignmentSubmission.assignment_id == assignment_id)
 
 
 @router.get("/{assignment_id}", response_model=AssignmentOut)
-def get_assignment(assignment_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_assignment(assignment_id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     a = db.execute(select(Assignment).where(Assignment.id == assignment_id)).scalar_one_or_none()
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
@@ -61,50 +127,31 @@ def get_assignment(assignment_id: int, db: Session = Depends(get_db), user: User
     )
 
 
+@router.get("/by_discipline/{discipline_id}/my", response_model=list[AssignmentSubmissionOut])
+def list_my_submissions(
+    discipline_id: int,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    if user.role != "student" or user.student_id is None:
+        raise HTTPException(status_code=403, detail="Student only")
+
+    return json_response(my_submissions(db, user.student_id, Assignment.discipline_id == discipline_id))
+
+
 @router.get("/{assignment_id}/my", response_model=AssignmentSubmissionOut)
 def get_my_submission(
     assignment_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    student = _get_student_profile(db, user)
-    if not student:
+    if user.role != "student" or user.student_id is None:
         raise HTTPException(status_code=403, detail="Student only")
 
-    sub = db.execute(
-        select(AssignmentSubmission).where(
-            and_(
-                AssignmentSubmission.assignment_id == assignment_id,
-                AssignmentSubmission.student_id == student.id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if not sub:
-        a = db.execute(select(Assignment).where(Assignment.id == assignment_id)).scalar_one_or_none()
-        if not a:
-            raise HTTPException(status_code=404, detail="Assignment not found")
-        sub = AssignmentSubmission(
-            student_id=student.id,
-            assignment_id=assignment_id,
-            answer_text="",
-            status="не сдано",
-            points=0,
-            max_points=a.max_points,
-        )
-        db.add(sub)
-        db.commit()
-        db.refresh(sub)
-
-    return AssignmentSubmissionOut(
-        id=sub.id,
-        student_id=sub.student_id,
-        assignment_id=sub.assignment_id,
-        answer_text=sub.answer_text,
-        status=sub.status,
-        points=sub.points,
-        max_points=sub.max_points,
-    )
+    found = my_submissions(db, user.student_id, Assignment.id == assignment_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    return AssignmentSubmissionOut(**found[0])
 
 
 @router.post("/{assignment_id}/submit", response_model=AssignmentSubmissionOut)
@@ -112,10 +159,9 @@ def submit_assignment(
     assignment_id: int,
     payload: AssignmentSubmitIn,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    student = _get_student_profile(db, user)
-    if not student:
+    if user.role != "student" or user.student_id is None:
         raise HTTPException(status_code=403, detail="Student only")
 
     a = db.execute(select(Assignment).where(Assignment.id == assignment_id)).scalar_one_or_none()
@@ -126,14 +172,14 @@ def submit_assignment(
         select(AssignmentSubmission).where(
             and_(
                 AssignmentSubmission.assignment_id == assignment_id,
-                AssignmentSubmission.student_id == student.id,
+                AssignmentSubmission.student_id == user.student_id,
             )
         )
     ).scalar_one_or_none()
 
     if not sub:
         sub = AssignmentSubmission(
-            student_id=student.id,
+            student_id=user.student_id,
             assignment_id=assignment_id,
             answer_text=payload.answer_text,
             status="сдано",
@@ -145,6 +191,8 @@ def submit_assignment(
         sub.answer_text = payload.answer_text
         sub.status = "сдано"
 
+    db.flush()
+    refresh_totals(db.connection(), {(user.student_id, a.discipline_id)})
     db.commit()
     db.refresh(sub)
 
@@ -181,6 +229,38 @@ def grade_submission(
         raise HTTPException(status_code=400, detail="Invalid points")
 
     sub.points = payload.points
-    sub.status = "проверено"
+    sub.status = GRADED
+    db.flush()
+    discipline_id = db.execute(select(Assignment.discipline_id).where(Assignment.id == assignment_id)).scalar_one()
+    refresh_totals(db.connection(), {(payload.student_id, discipline_id)})
+    cell = _graded_cell(sub.id, payload.student_id, discipline_id, assignment_id, payload.points)
     db.commit()
+    groups = invalidate_journals(db, {(payload.student_id, discipline_id)})
+    publish_cells("submission", groups, [cell])
     return {"ok": True}
+
+
+@router.post("/grade/bulk", response_model=BulkUpsertOut, dependencies=[Depends(require_role("teacher"))])
+def grade_submissions_bulk(payload: SubmissionGradeBulkIn, db: Session = Depends(get_db)):
+    cells = submission_cells(db, {item.submission_id for item in payload.items})
+
+    points: dict[int, int] = {}
+    results = []
+    for i, item in enumerate(payload.items):
+        cell = cells.get(item.submission_id)
+        if cell is None:
+            results.append(BulkCellResult(index=i, ok=False, error="Submission not found"))
+        elif item.points < 0 or item.points > cell[3]:
+            results.append(BulkCellResult(index=i, ok=False, error="Invalid points"))
+        else:
+            points[item.submission_id] = item.points
+            results.append(BulkCellResult(index=i, ok=True, id=item.submission_id))
+
+    if points:
+        pairs = {cells[id_][:2] for id_ in points}
+        grade_rows(db, points)
+        refresh_totals(db.connection(), pairs)
+        db.commit()
+        groups = invalidate_journals(db, pairs)
+        publish_cells("submission", groups, [_graded_cell(id_, *cells[id_][:3], p) for id_, p in points.items()])
+    return BulkUpsertOut(written=len(points), results=results)
@@ -1,37 +1,56 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
-from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import SessionLocal
 from app.models import User
+from app.principals import Principal
 from app.schemas import LoginIn, TokenOut, UserOut
-from app.security import create_access_token, verify_password
-from app.deps import get_current_user
+from app.security import PasswordPoolSaturated, create_access_token, revoke_token, verify_password_async
+from app.deps import get_current_user, oauth2_scheme
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+# The session is closed before hashing so a slow bcrypt check does not hold a pooled connection.
+def _find_credentials(username: str):
+    db = SessionLocal()
+    try:
+        return db.execute(select(User.id, User.password_hash).where(User.username == username)).first()
+    finally:
+        db.close()
+
+
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = db.execute(select(User).where(User.username == payload.username)).scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginIn):
+    user = await run_in_threadpool(_find_credentials, payload.username)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    try:
+        ok = await verify_password_async(payload.password, user.password_hash)
+    except PasswordPoolSaturated:
+        raise HTTPException(status_code=503, detail="Too many login attempts, retry shortly", headers={"Retry-After": "1"})
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(str(user.id))
     return TokenOut(access_token=token)
 
 
+@router.post("/logout", status_code=204)
+def logout(token: str = Depends(oauth2_scheme), user: Principal = Depends(get_current_user)):
+    revoke_token(token)
+
+
 @router.get("/me", response_model=UserOut)
-def me(user: User = Depends(get_current_user)):
-    student_id = user.student_profile.id if user.student_profile else None
-    group_id = user.student_profile.group_id if user.student_profile else None
-    teacher_id = user.teacher_profile.id if user.teacher_profile else None
+def me(user: Principal = Depends(get_current_user)):
     return UserOut(
         id=user.id,
         username=user.username,
         role=user.role,
         full_name=user.full_name,
-        student_id=student_id,
-        group_id=group_id,
-        teacher_id=teacher_id,
+        student_id=user.student_id,
+        group_id=user.group_id,
+        teacher_id=user.teacher_id,
     )
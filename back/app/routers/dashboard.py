@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.deps import get_current_user
+from app.fastjson import json_response
+from app.models import Assignment, AssignmentSubmission, Discipline, ScheduleItem, Teacher, User
+from app.principals import Principal
+from app.schedule_engine import schedule_items, schedule_query
+from app.schemas import DashboardOut
+from app.submissions import NOT_SUBMITTED
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("", response_model=DashboardOut)
+def dashboard(
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    # Everything the app shell needs on open, in three queries: week schedule,
+    # disciplines with teacher names, assignments with the student's own
+    # submission outer-joined. The user comes from the principal cache.
+    if start is None:
+        start = date.today() - timedelta(days=date.today().weekday())
+    if end is None:
+        end = start + timedelta(days=6)
+
+    week: list[dict] = []
+    if user.group_id is not None or user.teacher_id is not None:
+        week = schedule_items(
+            db,
+            schedule_query(user.group_id, None if user.group_id is not None else user.teacher_id)
+            .where(ScheduleItem.day >= start)
+            .where(ScheduleItem.day <= end)
+            .order_by(ScheduleItem.day, ScheduleItem.start_time, ScheduleItem.id),
+        )
+
+    disciplines = db.execute(
+        select(Discipline.id, Discipline.title, User.full_name, Discipline.max_points, Discipline.hours_total)
+        .outerjoin(Teacher, Discipline.teacher_id == Teacher.id)
+        .outerjoin(User, Teacher.user_id == User.id)
+        .order_by(Discipline.id)
+    ).all()
+
+    stmt = select(
+        Assignment.id,
+        Assignment.topic_id,
+        Assignment.discipline_id,
+        Assignment.title,
+        Assignment.max_points,
+    ).order_by(Assignment.discipline_id, Assignment.id)
+    if user.student_id is not None:
+        stmt = stmt.add_columns(AssignmentSubmission.status, AssignmentSubmission.points).outerjoin(
+            AssignmentSubmission,
+            and_(
+                AssignmentSubmission.assignment_id == Assignment.id,
+                AssignmentSubmission.student_id == user.student_id,
+            ),
+        )
+    assignments = db.execute(stmt).all()
+
+    return json_response(
+        {
+            "user": {
+                "id": user.id,
+                "username": user.username,
+                "role": user.role,
+                "full_name": user.full_name,
+                "student_id": user.student_id,
+                "group_id": user.group_id,
+                "teacher_id": user.teacher_id,
+            },
+            "week": {"start": start, "end": end, "items": week, "next_cursor": None},
+            "disciplines": [
+                {
+                    "id": id_,
+                    "title": title,
+                    "teacher_name": teacher_name or "",
+                    "max_points": max_points,
+                    "hours_total": hours_total,
+                }
+                for id_, title, teacher_name, max_points, hours_total in disciplines
+            ],
+            "assignments": [
+                {
+                    "id": row[0],
+                    "topic_id": row[1],
+                    "discipline_id": row[2],
+                    "title": row[3],
+                    "max_points": row[4],
+                    "submission_status": (row[5] or NOT_SUBMITTED) if user.student_id is not None else None,
+                    "submission_points": (row[6] or 0) if user.student_id is not None else None,
+                }
+                for row in assignments
+            ],
+        }
+    )
@@ -1,46 +1,79 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.conditional import not_modified
 from app.db import get_db
 from app.deps import get_current_user
-from app.models import Discipline, Topic, User
+from app.fastjson import json_response
+from app.models import Discipline, Teacher, Topic, User
+from app.pagination import decode_cursor, page_size, set_next_cursor, split_page
+from app.principals import Principal
 from app.schemas import DisciplineOut, TopicOut
+from app.versions import table_versions
 
 router = APIRouter(prefix="/disciplines", tags=["disciplines"])
 
 
 @router.get("", response_model=list[DisciplineOut])
-def list_disciplines(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    rows = (
-        db.execute(select(Discipline).order_by(Discipline.id))
-        .scalars()
-        .all()
+def list_disciplines(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Depends(page_size),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    unchanged = not_modified(request, response, *table_versions(db, ("disciplines", "teachers", "users")))
+    if unchanged:
+        return unchanged
+
+    stmt = (
+        select(Discipline.id, Discipline.title, User.full_name, Discipline.max_points, Discipline.hours_total)
+        .outerjoin(Teacher, Discipline.teacher_id == Teacher.id)
+        .outerjoin(User, Teacher.user_id == User.id)
+        .order_by(Discipline.id)
+        .limit(limit + 1)
     )
+    after = decode_cursor(cursor, (int,))
+    if after is not None:
+        stmt = stmt.where(Discipline.id > after[0])
 
-    out: list[DisciplineOut] = []
-    for d in rows:
-        out.append(
-            DisciplineOut(
-                id=d.id,
-                title=d.title,
-                teacher_name=d.teacher.user.full_name if d.teacher and d.teacher.user else "",
-                max_points=d.max_points,
-                hours_total=d.hours_total,
-            )
-        )
-    return out
+    rows, next_cursor = split_page(db.execute(stmt).all(), limit, lambda r: (r.id,))
+    set_next_cursor(response, next_cursor)
+    return json_response(
+        [
+            {
+                "id": id_,
+                "title": title,
+                "teacher_name": teacher_name or "",
+                "max_points": max_points,
+                "hours_total": hours_total,
+            }
+            for id_, title, teacher_name, max_points, hours_total in rows
+        ],
+        response,
+    )
 
 
 @router.get("/{discipline_id}/topics", response_model=list[TopicOut])
-def list_topics(discipline_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    topics = (
-        db.execute(
-            select(Topic)
-            .where(Topic.discipline_id == discipline_id)
-            .order_by(Topic.order_index)
-        )
-        .scalars()
-        .all()
+def list_topics(
+    discipline_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    unchanged = not_modified(request, response, *table_versions(db, ("topics",)))
+    if unchanged:
+        return unchanged
+
+    topics = db.execute(
+        select(Topic.id, Topic.title, Topic.order_index)
+        .where(Topic.discipline_id == discipline_id)
+        .order_by(Topic.order_index)
+    ).all()
+    return json_response(
+        [{"id": id_, "title": title, "order_index": order_index} for id_, title, order_index in topics],
+        response,
     )
-    return [TopicOut(id=t.id, title=t.title, order_index=t.order_index) for t in topics]
@@ -1,24 +1,115 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import and_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.deps import get_current_user, require_role
-from app.models import AttendanceRecord, GradeRecord, Group, Student, Topic, User
+from app.fastjson import json_response
+from app.journal_engine import (
+    attendance_journal_state,
+    attendance_journal_state_async,
+    build_attendance_journal,
+    build_grades_journal,
+    fetch_attendance_journal,
+    fetch_grades_journal,
+    grades_journal_state,
+    grades_journal_state_async,
+    pivot_attendance_journal,
+    pivot_grades_journal,
+)
+from app.journal_export import attendance_rows, grades_rows, stream_export
+from app.journal_totals import load_totals
+from app.journal_writes import (
+    ATTENDANCE_KEY,
+    GRADE_KEY,
+    missing_references,
+    upsert_attendance_rows,
+    upsert_grade_rows,
+)
+from app.live import publish_cells
+from app.principals import Principal
+from app.response_cache import cached_json, cached_json_async, invalidate_journals, journal_scope, table_scope
 from app.schemas import (
+    AttendanceBulkIn,
     AttendanceUpsertIn,
+    BulkCellResult,
+    BulkUpsertOut,
+    DisciplineTotalOut,
+    GradeBulkIn,
     GradeUpsertIn,
     JournalAttendanceOut,
-    JournalAttendanceStudentRow,
     JournalGradesOut,
-    JournalGradesStudentRow,
-    StudentShort,
-    TopicColumn,
 )
 
 router = APIRouter(prefix="/journal", tags=["journal"])
+# Native handlers for DB_ASYNC=true; the remaining routes run through run_sync.
+async_router = APIRouter(prefix="/journal", tags=["journal"])
+
+EXPORT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _valid_points(points: int, max_points: int) -> bool:
+    return 0 <= points <= max_points and max_points > 0
+
+
+def _day_list(days: str) -> list[date]:
+    return [date.fromisoformat(x.strip()) for x in days.split(",") if x.strip()]
+
+
+def _attendance_scopes(group_id: int, discipline_id: int) -> list[str]:
+    return [journal_scope(group_id, discipline_id), table_scope("students"), table_scope("users")]
+
+
+def _grades_scopes(group_id: int, discipline_id: int) -> list[str]:
+    return [journal_scope(group_id, discipline_id), *(table_scope(t) for t in ("students", "users", "topics"))]
+
+
+def _export(rows, fmt: str, sheet: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(rows, fmt, sheet),
+        media_type=EXPORT_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+def _write(db: Session, event: str, write, rows: list[dict]) -> dict[tuple, int]:
+    # References are checked up front; the IntegrityError only covers a row
+    # deleted in between.
+    try:
+        ids = write(db, rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Unknown student, discipline or topic")
+    groups = invalidate_journals(db, {(r["student_id"], r["discipline_id"]) for r in rows})
+    publish_cells(event, groups, rows)
+    return ids
+
+
+def _write_one(db: Session, event: str, write, row: dict) -> None:
+    error = missing_references(db, [row])[0]
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    _write(db, event, write, [row])
+
+
+def _write_bulk(db: Session, event: str, write, key: tuple[str, ...], rows: list[dict], errors: list) -> BulkUpsertOut:
+    errors = [e or ref for e, ref in zip(errors, missing_references(db, rows))]
+    ids = _write(db, event, write, [r for r, e in zip(rows, errors) if e is None])
+    results = [
+        BulkCellResult(index=i, ok=True, id=ids.get(tuple(r[k] for k in key)))
+        if error is None
+        else BulkCellResult(index=i, ok=False, error=error)
+        for i, (r, error) in enumerate(zip(rows, errors))
+    ]
+    return BulkUpsertOut(written=len(ids), results=results)
 
 
 @router.get("/attendance", response_model=JournalAttendanceOut)
@@ -26,163 +117,146 @@ def attendance_journal(
     group_id: int,
     discipline_id: int,
     days: str,
+    request: Request,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    day_list = [date.fromisoformat(x.strip()) for x in days.split(",") if x.strip()]
-
-    students = (
-        db.execute(
-            select(Student)
-            .join(Group, Student.group_id == Group.id)
-            .where(Student.group_id == group_id)
-            .order_by(Student.id)
-        )
-        .scalars()
-        .all()
+    day_list = _day_list(days)
+    return cached_json(
+        request,
+        _attendance_scopes(group_id, discipline_id),
+        ("attendance", group_id, discipline_id, tuple(day_list)),
+        lambda: attendance_journal_state(db, group_id, discipline_id, day_list),
+        lambda: build_attendance_journal(db, group_id, discipline_id, day_list),
     )
 
-    rows: list[JournalAttendanceStudentRow] = []
-    for s in students:
-        statuses: dict[str, str] = {}
-        for d in day_list:
-            rec = db.execute(
-                select(AttendanceRecord)
-                .where(
-                    and_(
-                        AttendanceRecord.student_id == s.id,
-                        AttendanceRecord.discipline_id == discipline_id,
-                        AttendanceRecord.day == d,
-                    )
-                )
-            ).scalar_one_or_none()
-            statuses[d.isoformat()] = rec.status if rec else "не выставлено"
-
-        full_name = s.user.full_name if s.user else ""
-        rows.append(
-            JournalAttendanceStudentRow(
-                student=StudentShort(id=s.id, full_name=full_name),
-                statuses=statuses,
-            )
-        )
-
-    return JournalAttendanceOut(days=day_list, rows=rows)
-
 
 @router.post("/attendance", dependencies=[Depends(require_role("teacher"))])
 def upsert_attendance(
     payload: AttendanceUpsertIn,
     db: Session = Depends(get_db),
 ):
-    rec = db.execute(
-        select(AttendanceRecord).where(
-            and_(
-                AttendanceRecord.student_id == payload.student_id,
-                AttendanceRecord.discipline_id == payload.discipline_id,
-                AttendanceRecord.day == payload.day,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if rec:
-        rec.status = payload.status
-    else:
-        rec = AttendanceRecord(
-            student_id=payload.student_id,
-            discipline_id=payload.discipline_id,
-            day=payload.day,
-            status=payload.status,
-        )
-        db.add(rec)
-
-    db.commit()
+    _write_one(db, "attendance", upsert_attendance_rows, payload.model_dump())
     return {"ok": True}
 
 
+@router.post("/attendance/bulk", response_model=BulkUpsertOut, dependencies=[Depends(require_role("teacher"))])
+def upsert_attendance_bulk(payload: AttendanceBulkIn, db: Session = Depends(get_db)):
+    rows = [item.model_dump() for item in payload.items]
+    return _write_bulk(db, "attendance", upsert_attendance_rows, ATTENDANCE_KEY, rows, [None] * len(rows))
+
+
 @router.get("/grades", response_model=JournalGradesOut)
 def grades_journal(
     group_id: int,
     discipline_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    topics = (
-        db.execute(
-            select(Topic)
-            .where(Topic.discipline_id == discipline_id)
-            .order_by(Topic.order_index)
-        )
-        .scalars()
-        .all()
-    )
-    topic_cols = [TopicColumn(topic_id=t.id, title=t.title, max_points=5) for t in topics]
-
-    students = (
-        db.execute(
-            select(Student)
-            .where(Student.group_id == group_id)
-            .order_by(Student.id)
-        )
-        .scalars()
-        .all()
+    return cached_json(
+        request,
+        _grades_scopes(group_id, discipline_id),
+        ("grades", group_id, discipline_id),
+        lambda: grades_journal_state(db, group_id, discipline_id),
+        lambda: build_grades_journal(db, group_id, discipline_id),
     )
 
-    rows: list[JournalGradesStudentRow] = []
-    for s in students:
-        points_map: dict[str, str] = {}
-        for t in topics:
-            rec = db.execute(
-                select(GradeRecord).where(
-                    and_(
-                        GradeRecord.student_id == s.id,
-                        GradeRecord.discipline_id == discipline_id,
-                        GradeRecord.topic_id == t.id,
-                    )
-                )
-            ).scalar_one_or_none()
-            if rec:
-                points_map[str(t.id)] = f"{rec.points}/{rec.max_points}"
-            else:
-                points_map[str(t.id)] = "не выставлено"
-
-        full_name = s.user.full_name if s.user else ""
-        rows.append(
-            JournalGradesStudentRow(
-                student=StudentShort(id=s.id, full_name=full_name),
-                points=points_map,
-            )
-        )
-
-    return JournalGradesOut(topics=topic_cols, rows=rows)
-
 
 @router.post("/grades", dependencies=[Depends(require_role("teacher"))])
 def upsert_grade(payload: GradeUpsertIn, db: Session = Depends(get_db)):
-    if payload.points < 0 or payload.max_points <= 0 or payload.points > payload.max_points:
+    if not _valid_points(payload.points, payload.max_points):
         raise HTTPException(status_code=400, detail="Invalid points")
 
-    rec = db.execute(
-        select(GradeRecord).where(
-            and_(
-                GradeRecord.student_id == payload.student_id,
-                GradeRecord.discipline_id == payload.discipline_id,
-                GradeRecord.topic_id == payload.topic_id,
-            )
-        )
-    ).scalar_one_or_none()
-
-    if rec:
-        rec.points = payload.points
-        rec.max_points = payload.max_points
-    else:
-        rec = GradeRecord(
-            student_id=payload.student_id,
-            discipline_id=payload.discipline_id,
-            topic_id=payload.topic_id,
-            points=payload.points,
-            max_points=payload.max_points,
-        )
-        db.add(rec)
-
-    db.commit()
+    _write_one(db, "grade", upsert_grade_rows, payload.model_dump())
     return {"ok": True}
+
+
+@router.post("/grades/bulk", response_model=BulkUpsertOut, dependencies=[Depends(require_role("teacher"))])
+def upsert_grade_bulk(payload: GradeBulkIn, db: Session = Depends(get_db)):
+    rows = [item.model_dump() for item in payload.items]
+    errors = [None if _valid_points(r["points"], r["max_points"]) else "Invalid points" for r in rows]
+    return _write_bulk(db, "grade", upsert_grade_rows, GRADE_KEY, rows, errors)
+
+
+@router.get("/attendance/export", dependencies=[Depends(require_role("teacher"))])
+def export_attendance(
+    discipline_id: int,
+    start: date,
+    end: date,
+    group_id: int | None = None,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+):
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return _export(
+        lambda db: attendance_rows(db, discipline_id, group_id, start, end),
+        format,
+        "Посещаемость",
+        f"attendance-{discipline_id}-{group_id or 'all'}-{start}-{end}",
+    )
+
+
+@router.get("/grades/export", dependencies=[Depends(require_role("teacher"))])
+def export_grades(
+    discipline_id: int,
+    group_id: int | None = None,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+):
+    return _export(
+        lambda db: grades_rows(db, discipline_id, group_id),
+        format,
+        "Оценки",
+        f"grades-{discipline_id}-{group_id or 'all'}",
+    )
+
+
+@router.get("/summary", response_model=list[DisciplineTotalOut])
+def discipline_summary(
+    group_id: int | None = None,
+    student_id: int | None = None,
+    discipline_id: int | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    if group_id is None and student_id is None:
+        raise HTTPException(status_code=400, detail="group_id or student_id is required")
+    return json_response(load_totals(db, group_id, student_id, discipline_id))
+
+
+@async_router.get("/attendance", response_model=JournalAttendanceOut)
+async def attendance_journal_async(
+    group_id: int,
+    discipline_id: int,
+    days: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
+):
+    day_list = _day_list(days)
+    return await cached_json_async(
+        request,
+        _attendance_scopes(group_id, discipline_id),
+        ("attendance", group_id, discipline_id, tuple(day_list)),
+        lambda: attendance_journal_state_async(db, group_id, discipline_id, day_list),
+        lambda: fetch_attendance_journal(db, group_id, discipline_id, day_list),
+        lambda fetched: pivot_attendance_journal(*fetched, day_list),
+    )
+
+
+@async_router.get("/grades", response_model=JournalGradesOut)
+async def grades_journal_async(
+    group_id: int,
+    discipline_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
+):
+    return await cached_json_async(
+        request,
+        _grades_scopes(group_id, discipline_id),
+        ("grades", group_id, discipline_id),
+        lambda: grades_journal_state_async(db, group_id, discipline_id),
+        lambda: fetch_grades_journal(db, group_id, discipline_id),
+        lambda fetched: pivot_grades_journal(*fetched),
+    )
@@ -0,0 +1,47 @@
+import asyncio
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.deps import get_current_user, get_stream_user
+from app.live import live_hub
+from app.principals import Principal
+from app.response_cache import journal_scope
+from app.schemas import StreamTicketOut
+from app.security import create_stream_ticket
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+
+async def _events(channel: str):
+    queue = live_hub.subscribe(channel)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(queue.get(), settings.live_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if frame is None:
+                return
+            yield frame
+    finally:
+        live_hub.unsubscribe(channel, queue)
+
+
+@router.post("/ticket", response_model=StreamTicketOut)
+async def stream_ticket(user: Principal = Depends(get_current_user)):
+    return StreamTicketOut(ticket=create_stream_ticket(str(user.id)), expires_in=settings.live_ticket_seconds)
+
+
+@router.get("/journal")
+async def journal_events(group_id: int, discipline_id: int, user: Principal = Depends(get_stream_user)):
+    # Events: attendance, grade and submission, each carrying the changed cells
+    # of this (group, discipline) journal.
+    return StreamingResponse(
+        _events(journal_scope(group_id, discipline_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
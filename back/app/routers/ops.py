@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.db import async_engine, engine
+from app.metrics import REGISTRY
+from app.pool_metrics import pool_snapshot
+
+router = APIRouter(tags=["ops"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/ops/pool")
+def pool_stats():
+    out = {"sync": pool_snapshot(engine.pool)}
+    if async_engine is not None:
+        out["async"] = pool_snapshot(async_engine.pool)
+    return out
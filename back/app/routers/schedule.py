@@ -1,72 +1,105 @@
-from datetime import date
+from datetime import date, time
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.deps import get_current_user
-from app.models import ScheduleItem, User
+from app.fastjson import json_response
+from app.models import ScheduleItem
+from app.pagination import decode_cursor, page_size, split_page
+from app.principals import Principal
+from app.response_cache import cached_json, cached_json_async, table_scope
+from app.schedule_engine import schedule_items, schedule_query, schedule_rows
 from app.schemas import ScheduleItemOut, WeekScheduleOut
+from app.versions import table_versions, table_versions_async
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
+# Native handlers for DB_ASYNC=true; the remaining routes run through run_sync.
+async_router = APIRouter(prefix="/schedule", tags=["schedule"])
 
+WEEK_TABLES = ("schedule_items", "disciplines", "groups")
 
-@router.get("/day", response_model=list[ScheduleItemOut])
-def schedule_for_day(day: date, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    items = (
-        db.execute(select(ScheduleItem).where(ScheduleItem.day == day).order_by(ScheduleItem.start_time))
-        .scalars()
-        .all()
+
+def _week_query(
+    start: date, end: date, group_id: int | None, teacher_id: int | None, cursor: str | None, limit: int
+) -> Select:
+    after = decode_cursor(cursor, (date.fromisoformat, time.fromisoformat, int))
+    stmt = (
+        schedule_query(group_id, teacher_id)
+        .where(ScheduleItem.day >= start)
+        .where(ScheduleItem.day <= end)
+        .order_by(ScheduleItem.day, ScheduleItem.start_time, ScheduleItem.id)
+        .limit(limit + 1)
     )
+    if after is not None:
+        stmt = stmt.where(tuple_(ScheduleItem.day, ScheduleItem.start_time, ScheduleItem.id) > after)
+    return stmt
+
+
+def _week(start: date, end: date, rows, limit: int) -> dict:
+    items, next_cursor = split_page(schedule_rows(rows), limit, lambda i: (i["day"], i["start_time"], i["id"]))
+    return {"start": start, "end": end, "items": items, "next_cursor": next_cursor}
 
-    out: list[ScheduleItemOut] = []
-    for it in items:
-        out.append(
-            ScheduleItemOut(
-                id=it.id,
-                day=it.day,
-                start_time=it.start_time,
-                end_time=it.end_time,
-                room=it.room,
-                discipline_title=it.discipline.title if it.discipline else "",
-                group_name=it.group.name if it.group else "",
-            )
-        )
 
-    return out
+@router.get("/day", response_model=list[ScheduleItemOut])
+def schedule_for_day(
+    day: date,
+    group_id: int | None = None,
+    teacher_id: int | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    stmt = schedule_query(group_id, teacher_id).where(ScheduleItem.day == day).order_by(ScheduleItem.start_time)
+    return json_response(schedule_items(db, stmt))
 
 
 @router.get("/week", response_model=WeekScheduleOut)
 def schedule_for_week(
     start: date,
     end: date,
+    request: Request,
+    group_id: int | None = None,
+    teacher_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Depends(page_size),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    items = (
-        db.execute(
-            select(ScheduleItem)
-            .where(ScheduleItem.day >= start)
-            .where(ScheduleItem.day <= end)
-            .order_by(ScheduleItem.day, ScheduleItem.start_time)
-        )
-        .scalars()
-        .all()
+    stmt = _week_query(start, end, group_id, teacher_id, cursor, limit)
+    return cached_json(
+        request,
+        [table_scope(t) for t in WEEK_TABLES],
+        ("schedule_week", start, end, group_id, teacher_id, cursor, limit),
+        lambda: table_versions(db, WEEK_TABLES),
+        lambda: _week(start, end, db.execute(stmt), limit),
     )
 
-    out_items: list[ScheduleItemOut] = []
-    for it in items:
-        out_items.append(
-            ScheduleItemOut(
-                id=it.id,
-                day=it.day,
-                start_time=it.start_time,
-                end_time=it.end_time,
-                room=it.room,
-                discipline_title=it.discipline.title if it.discipline else "",
-                group_name=it.group.name if it.group else "",
-            )
-        )
-
-    return WeekScheduleOut(start=start, end=end, items=out_items)
+
+@async_router.get("/week", response_model=WeekScheduleOut)
+async def schedule_for_week_async(
+    start: date,
+    end: date,
+    request: Request,
+    group_id: int | None = None,
+    teacher_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Depends(page_size),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
+):
+    stmt = _week_query(start, end, group_id, teacher_id, cursor, limit)
+
+    async def fetch() -> list:
+        return (await db.execute(stmt)).all()
+
+    return await cached_json_async(
+        request,
+        [table_scope(t) for t in WEEK_TABLES],
+        ("schedule_week", start, end, group_id, teacher_id, cursor, limit),
+        lambda: table_versions_async(db, WEEK_TABLES),
+        fetch,
+        lambda rows: _week(start, end, rows, limit),
+    )
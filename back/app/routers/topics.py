@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.conditional import not_modified
 from app.db import get_db
 from app.deps import get_current_user
-from app.models import Topic, User
+from app.models import Topic
+from app.principals import Principal
 from app.schemas import TopicDetailOut
+from app.versions import table_versions
 
 router = APIRouter(prefix="/topics", tags=["topics"])
 
 
 @router.get("/{topic_id}", response_model=TopicDetailOut)
-def get_topic(topic_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_topic(
+    topic_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    unchanged = not_modified(request, response, *table_versions(db, ("topics", "disciplines")))
+    if unchanged:
+        return unchanged
+
     t = db.execute(select(Topic).where(Topic.id == topic_id)).scalar_one_or_none()
     if not t:
         raise HTTPException(status_code=404, detail="Topic not found")
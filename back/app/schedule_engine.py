@@ -0,0 +1,44 @@
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.models import Discipline, Group, ScheduleItem
+
+
+def schedule_query(group_id: int | None, teacher_id: int | None) -> Select:
+    stmt = (
+        select(
+            ScheduleItem.id,
+            ScheduleItem.day,
+            ScheduleItem.start_time,
+            ScheduleItem.end_time,
+            ScheduleItem.room,
+            Discipline.title,
+            Group.name,
+        )
+        .join(Discipline, ScheduleItem.discipline_id == Discipline.id)
+        .join(Group, ScheduleItem.group_id == Group.id)
+    )
+    if group_id is not None:
+        stmt = stmt.where(ScheduleItem.group_id == group_id)
+    if teacher_id is not None:
+        stmt = stmt.where(Discipline.teacher_id == teacher_id)
+    return stmt
+
+
+def schedule_items(db: Session, stmt: Select) -> list[dict]:
+    return schedule_rows(db.execute(stmt))
+
+
+def schedule_rows(rows) -> list[dict]:
+    return [
+        {
+            "id": id_,
+            "day": day,
+            "start_time": start_time,
+            "end_time": end_time,
+            "room": room,
+            "discipline_title": discipline_title,
+            "group_name": group_name,
+        }
+        for id_, day, start_time, end_time, room, discipline_title, group_name in rows
+    ]
@@ -1,6 +1,8 @@
-from datetime import date, time
+from datetime import date, datetime, time
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+BULK_MAX_CELLS = 1000
 
 
 class TokenOut(BaseModel):
@@ -8,6 +10,11 @@ class TokenOut(BaseModel):
     token_type: str = "bearer"
 
 
+class StreamTicketOut(BaseModel):
+    ticket: str
+    expires_in: int
+
+
 class LoginIn(BaseModel):
     username: str
     password: str
@@ -51,6 +58,7 @@ class WeekScheduleOut(BaseModel):
     start: date
     end: date
     items: list[ScheduleItemOut]
+    next_cursor: str | None = None
 
 
 class StudentShort(BaseModel):
@@ -75,6 +83,10 @@ class AttendanceUpsertIn(BaseModel):
     status: str
 
 
+class AttendanceBulkIn(BaseModel):
+    items: list[AttendanceUpsertIn] = Field(max_length=BULK_MAX_CELLS)
+
+
 class TopicColumn(BaseModel):
     topic_id: int
     title: str
@@ -99,6 +111,35 @@ class GradeUpsertIn(BaseModel):
     max_points: int = 5
 
 
+class GradeBulkIn(BaseModel):
+    items: list[GradeUpsertIn] = Field(max_length=BULK_MAX_CELLS)
+
+
+class BulkCellResult(BaseModel):
+    index: int
+    ok: bool
+    id: int | None = None
+    error: str | None = None
+
+
+class BulkUpsertOut(BaseModel):
+    written: int
+    results: list[BulkCellResult]
+
+
+class DisciplineTotalOut(BaseModel):
+    student_id: int
+    full_name: str
+    discipline_id: int
+    discipline_title: str
+    points: int
+    max_points: int
+    present: int
+    absent: int
+    marked: int
+    attendance_rate: float | None = None
+
+
 class TopicDetailOut(BaseModel):
     id: int
     discipline_id: int
@@ -118,7 +159,7 @@ class AssignmentOut(BaseModel):
 
 
 class AssignmentSubmissionOut(BaseModel):
-    id: int
+    id: int | None = None
     student_id: int
     assignment_id: int
     answer_text: str
@@ -134,3 +175,43 @@ class AssignmentSubmitIn(BaseModel):
 class AssignmentGradeIn(BaseModel):
     student_id: int
     points: int
+
+
+class SubmissionReviewOut(BaseModel):
+    id: int
+    assignment_id: int
+    assignment_title: str
+    student_id: int
+    full_name: str
+    group_name: str
+    answer_text: str
+    status: str
+    points: int
+    max_points: int
+    updated_at: datetime
+
+
+class SubmissionGradeIn(BaseModel):
+    submission_id: int
+    points: int
+
+
+class SubmissionGradeBulkIn(BaseModel):
+    items: list[SubmissionGradeIn] = Field(max_length=BULK_MAX_CELLS)
+
+
+class DashboardAssignmentOut(BaseModel):
+    id: int
+    topic_id: int
+    discipline_id: int
+    title: str
+    max_points: int
+    submission_status: str | None = None
+    submission_points: int | None = None
+
+
+class DashboardOut(BaseModel):
+    user: UserOut
+    week: WeekScheduleOut
+    disciplines: list[DisciplineOut]
+    assignments: list[DashboardAssignmentOut]
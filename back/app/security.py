@@ -1,19 +1,62 @@
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.cache import TTLCache
 from app.config import settings
+from app.metrics import JWT_DECODE_FAILURES, PASSWORD_VERIFY
 
 _pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small dedicated thread pool keeps hashing off
+# the shared request threadpool. Slots cover running plus queued jobs.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_workers, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(settings.password_workers + settings.password_queue_limit)
+
+
+# Verified tokens map sha256(token) -> (sub, exp) and expire at the token's own
+# exp, so repeat requests skip python-jose entirely. Revoked digests are kept
+# until the token would have expired anyway and are never evicted before that,
+# since an evicted revocation would make the token valid again.
+token_cache = TTLCache("token", maxsize=settings.token_cache_size, ttl=settings.jwt_expires_minutes * 60)
+revoked_tokens = TTLCache("revoked_token", maxsize=None, ttl=settings.jwt_expires_minutes * 60)
+
+
+STREAM_AUDIENCE = "live"
+
+
+class PasswordPoolSaturated(Exception):
+    pass
+
 
 def hash_password(password: str) -> str:
     return _pwd.hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return _pwd.verify(password, password_hash)
+    started = time.perf_counter()
+    try:
+        return _pwd.verify(password, password_hash)
+    finally:
+        PASSWORD_VERIFY.observe(time.perf_counter() - started)
+
+
+async def _run_hashing(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordPoolSaturated()
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await _run_hashing(verify_password, password, password_hash)
 
 
 def create_access_token(subject: str) -> str:
@@ -22,12 +65,64 @@ def create_access_token(subject: str) -> str:
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
 
 
+def create_stream_ticket(subject: str) -> str:
+    # Event streams take credentials in the URL, which ends up in access logs,
+    # so they get a short-lived ticket. The audience claim keeps it from
+    # passing as a bearer token: decode_token, which sets no audience, rejects it.
+    expire = datetime.utcnow() + timedelta(seconds=settings.live_ticket_seconds)
+    payload = {"sub": subject, "exp": expire, "aud": STREAM_AUDIENCE}
+    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_alg)
+
+
+def decode_stream_ticket(ticket: str) -> str | None:
+    try:
+        payload = jwt.decode(ticket, settings.jwt_secret, algorithms=[settings.jwt_alg], audience=STREAM_AUDIENCE)
+    except JWTError:
+        JWT_DECODE_FAILURES.inc()
+        return None
+    # jose skips the audience check for tokens without one, so access tokens
+    # have to be turned away here.
+    sub = payload.get("sub")
+    if payload.get("aud") != STREAM_AUDIENCE or not sub:
+        JWT_DECODE_FAILURES.inc()
+        return None
+    return str(sub)
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
 def decode_token(token: str) -> str | None:
+    digest = _digest(token)
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return cached[0]
+    if revoked_tokens.get(digest) is not None:
+        JWT_DECODE_FAILURES.inc()
+        return None
+
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_alg])
         sub = payload.get("sub")
         if not sub:
+            JWT_DECODE_FAILURES.inc()
             return None
-        return str(sub)
     except JWTError:
+        JWT_DECODE_FAILURES.inc()
         return None
+
+    exp = payload.get("exp")
+    token_cache.set(digest, (str(sub), exp), ttl=exp - time.time() if exp else None)
+    return str(sub)
+
+
+def revoke_token(token: str) -> None:
+    # Later requests with this token fail in this worker until it expires.
+    digest = _digest(token)
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return
+    token_cache.pop(digest)
+    revoked_tokens.set(digest, True, ttl=exp - time.time() if exp else None)
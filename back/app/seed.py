@@ -3,6 +3,7 @@ from datetime import date, time, timedelta
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.journal_totals import refresh_totals
 from app.models import (
     Assignment,
     AssignmentSubmission,
@@ -39,18 +40,17 @@ def seed(db: Session) -> None:
         "Смирнов Д. А.",
     ]
 
+    teacher_hash = hash_password("teacher")
     teachers: list[Teacher] = []
     for i, full_name in enumerate(teacher_names, start=1):
         u = User(
             username=f"teacher{i}",
-            password_hash=hash_password("teacher"),
+            password_hash=teacher_hash,
             role="teacher",
             full_name=full_name,
             is_active=True,
         )
-        db.add(u)
-        db.flush()
-        t = Teacher(user_id=u.id)
+        t = Teacher(user=u)
         db.add(t)
         teachers.append(t)
 
@@ -72,22 +72,22 @@ def seed(db: Session) -> None:
         "Федоров Никита Павлович",
     ]
 
+    student_hash = hash_password("student")
     students: list[Student] = []
     for i, full_name in enumerate(student_names, start=1):
         u = User(
             username=f"student{i}",
-            password_hash=hash_password("student"),
+            password_hash=student_hash,
             role="student",
             full_name=full_name,
             is_active=True,
         )
-        db.add(u)
-        db.flush()
-        g = groups[(i - 1) % len(groups)]
-        s = Student(user_id=u.id, group_id=g.id)
+        s = Student(user=u, group=groups[(i - 1) % len(groups)])
         db.add(s)
         students.append(s)
 
+    db.flush()
+
     discipline_titles = [
         "Основы UX/UI для фронтенд-разработки",
         "HTML/CSS",
@@ -209,4 +209,6 @@ def seed(db: Session) -> None:
                 )
             )
 
+    db.flush()
+    refresh_totals(db.connection())
     db.commit()
@@ -0,0 +1,92 @@
+from sqlalchemy import and_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.journal_totals import GRADED
+from app.models import Assignment, AssignmentSubmission, Group, Student, User
+
+NOT_SUBMITTED = "не сдано"
+SUBMITTED = "сдано"
+
+
+def my_submissions(db: Session, student_id: int, *criteria) -> list[dict]:
+    # Assignments the student has not submitted yet get a virtual default
+    # submission (id None) instead of a stored placeholder row; rows are only
+    # written by submit_assignment.
+    rows = db.execute(
+        select(
+            Assignment.id,
+            Assignment.max_points,
+            AssignmentSubmission.id,
+            AssignmentSubmission.answer_text,
+            AssignmentSubmission.status,
+            AssignmentSubmission.points,
+            AssignmentSubmission.max_points,
+        )
+        .outerjoin(
+            AssignmentSubmission,
+            and_(AssignmentSubmission.assignment_id == Assignment.id, AssignmentSubmission.student_id == student_id),
+        )
+        .where(*criteria)
+        .order_by(Assignment.id)
+    ).all()
+    return [
+        {
+            "id": sub_id,
+            "student_id": student_id,
+            "assignment_id": assignment_id,
+            "answer_text": answer_text or "",
+            "status": status or NOT_SUBMITTED,
+            "points": points or 0,
+            "max_points": max_points if sub_id is not None else assignment_max,
+        }
+        for assignment_id, assignment_max, sub_id, answer_text, status, points, max_points in rows
+    ]
+
+
+def review_queue(db: Session, status: str | None, after: tuple | None, limit: int, *criteria) -> list[dict]:
+    # Walks (assignment_id, student_id), the leading columns of
+    # ix_assignment_submissions_assignment_student, so each page is one range scan.
+    s = AssignmentSubmission
+    stmt = (
+        select(
+            s.id,
+            s.assignment_id,
+            Assignment.title.label("assignment_title"),
+            s.student_id,
+            User.full_name,
+            Group.name.label("group_name"),
+            s.answer_text,
+            s.status,
+            s.points,
+            s.max_points,
+            s.updated_at,
+        )
+        .join(Assignment, s.assignment_id == Assignment.id)
+        .join(Student, s.student_id == Student.id)
+        .join(User, Student.user_id == User.id)
+        .join(Group, Student.group_id == Group.id)
+        .where(s.status.in_([status] if status else [SUBMITTED, GRADED]), *criteria)
+        .order_by(s.assignment_id, s.student_id)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(s.assignment_id, s.student_id) > after)
+    return [{**row._asdict(), "full_name": row.full_name or ""} for row in db.execute(stmt)]
+
+
+def submission_cells(db: Session, ids: set[int]) -> dict[int, tuple[int, int, int, int]]:
+    # submission id -> (student_id, discipline_id, assignment_id, max_points)
+    s = AssignmentSubmission
+    rows = db.execute(
+        select(s.id, s.student_id, Assignment.discipline_id, s.assignment_id, s.max_points)
+        .join(Assignment, s.assignment_id == Assignment.id)
+        .where(s.id.in_(ids))
+    )
+    return {id_: tuple(rest) for id_, *rest in rows}
+
+
+def grade_rows(db: Session, points: dict[int, int]) -> None:
+    db.execute(
+        update(AssignmentSubmission),
+        [{"id": id_, "points": p, "status": GRADED} for id_, p in points.items()],
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+
+# Journal writes and the totals table are kept up to date with single
+# INSERT .. ON CONFLICT statements, which only these dialects compile.
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class UnsupportedDatabase(RuntimeError):
+    pass
+
+
+def ensure_upsert_support(engine: Engine) -> None:
+    if engine.dialect.name not in _INSERTS:
+        raise UnsupportedDatabase(
+            f"{engine.dialect.name} has no INSERT .. ON CONFLICT; DATABASE_URL must point at PostgreSQL or SQLite"
+        )
+
+
+def upsert_insert(conn: Connection, table):
+    return _INSERTS[conn.dialect.name](table)
@@ -0,0 +1,59 @@
+from sqlalchemy import Select, event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import TableVersion
+
+# Tables whose rows change rarely and are served to polling clients. Every ORM
+# flush that touches one of them bumps its counter in the same transaction, so
+# readers can build a validator from a single primary-key lookup.
+TRACKED_TABLES = (
+    "users",
+    "teachers",
+    "groups",
+    "students",
+    "disciplines",
+    "topics",
+    "assignments",
+    "schedule_items",
+)
+
+
+def _versions_query(names: tuple[str, ...]) -> Select:
+    return select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(names))
+
+
+def table_versions(db: Session, names: tuple[str, ...]) -> tuple[int, ...]:
+    rows = dict(db.execute(_versions_query(names)).all())
+    return tuple(rows.get(name, 0) for name in names)
+
+
+async def table_versions_async(db: AsyncSession, names: tuple[str, ...]) -> tuple[int, ...]:
+    rows = dict((await db.execute(_versions_query(names))).all())
+    return tuple(rows.get(name, 0) for name in names)
+
+
+def bump_table_versions(conn: Connection, names: set[str]) -> None:
+    if not names:
+        return
+    result = conn.execute(
+        update(TableVersion).where(TableVersion.name.in_(names)).values(version=TableVersion.version + 1)
+    )
+    if result.rowcount != len(names):
+        present = set(conn.execute(select(TableVersion.name).where(TableVersion.name.in_(names))).scalars())
+        missing = names - present
+        if missing:
+            conn.execute(insert(TableVersion), [{"name": name, "version": 1} for name in missing])
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_touched(session: Session, flush_context) -> None:
+    touched = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__table__", None) is not None and obj.__table__.name in TRACKED_TABLES
+    }
+    if touched:
+        bump_table_versions(session.connection(), touched)
+        session.info.setdefault("touched_tables", set()).update(touched)
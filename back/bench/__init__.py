@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Benchmarks run against a throwaway SQLite file unless DATABASE_URL points elsewhere.
+# This has to happen before anything imports app.config.
+BENCH_DATABASE_URL = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'edu_bench.db')}"
+os.environ.setdefault("DATABASE_URL", BENCH_DATABASE_URL)
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("SEED_ON_START", "false")
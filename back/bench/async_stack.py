@@ -0,0 +1,116 @@
+"""Compares requests per second of the sync and async (DB_ASYNC) database stacks.
+
+    python -m bench.async_stack --concurrency 50 --requests 2000
+
+Each stack runs in its own interpreter because the stack is chosen at import
+time. Point DATABASE_URL at a local Postgres for realistic numbers; the
+default SQLite file (with aiosqlite) is only a stand-in.
+
+The journal has a native async handler that queries on the event loop and
+pivots and encodes in the threadpool; /disciplines runs its sync handler
+through run_sync on the loop. The p95 of that cheap request is reported next
+to the journal's to show whether the heavy route holds up the loop.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date
+
+from bench.common import make_discipline, make_group, reset_schema, semester_days
+
+
+async def drive(concurrency: int, total: int, group_id: int, discipline_id: int, days: list[date]) -> dict:
+    import httpx
+
+    from app.db import async_engine
+    from app.main import app
+    from app.security import create_access_token
+
+    days_param = ",".join(d.isoformat() for d in days)
+    paths = ["/disciplines", f"/journal/attendance?group_id={group_id}&discipline_id={discipline_id}&days={days_param}"]
+    headers = {"Authorization": f"Bearer {create_access_token('1')}"}
+    remaining = iter(range(total))
+    latencies: list[list[float]] = [[] for _ in paths]
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for i in remaining:
+            t = time.perf_counter()
+            r = await client.get(paths[i % len(paths)], headers=headers)
+            r.raise_for_status()
+            latencies[i % len(paths)].append((time.perf_counter() - t) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get(paths[0], headers=headers)
+            t0 = time.perf_counter()
+            await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - t0
+    finally:
+        # ASGITransport sends no lifespan events, so the app's shutdown hook
+        # does not run here.
+        if async_engine is not None:
+            await async_engine.dispose()
+
+    light, heavy = (sorted(seen)[int(len(seen) * 0.95)] for seen in latencies)
+    return {"requests": total, "seconds": elapsed, "rps": total / elapsed, "light_p95": light, "heavy_p95": heavy}
+
+
+def worker(args) -> int:
+    spec = json.loads(args.worker)
+    days = [date.fromisoformat(d) for d in spec["days"]]
+    result = asyncio.run(drive(args.concurrency, args.requests, spec["group_id"], spec["discipline_id"], days))
+    print(json.dumps(result))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+
+    from app.db import engine
+
+    reset_schema()
+    days = semester_days(date(2025, 9, 1), args.weeks)
+    with engine.begin() as conn:
+        discipline_id, _ = make_discipline(conn, 0)
+        group_id = make_group(conn, "bench", args.students, days, discipline_id, [])
+    spec = json.dumps({"group_id": group_id, "discipline_id": discipline_id, "days": [d.isoformat() for d in days]})
+
+    print(f"{'stack':>6} {'requests':>8} {'seconds':>8} {'rps':>8} {'light p95 ms':>12} {'journal p95 ms':>14}")
+    for stack, flag in (("sync", "false"), ("async", "true")):
+        out = subprocess.run(
+            [
+                sys.executable, "-m", "bench.async_stack",
+                "--concurrency", str(args.concurrency),
+                "--requests", str(args.requests),
+                "--worker", spec,
+            ],
+            # The response cache would turn the journal into a lookup on both stacks.
+            env={**os.environ, "DB_ASYNC": flag, "RESPONSE_CACHE_BACKEND": "none"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"{stack:>6} {result['requests']:>8} {result['seconds']:>8.2f} {result['rps']:>8.1f} "
+            f"{result['light_p95']:>12.1f} {result['heavy_p95']:>14.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
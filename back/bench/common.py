@@ -0,0 +1,126 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert, select
+
+from app.db import Base, async_engine, engine
+from app.models import AttendanceRecord, Discipline, GradeRecord, Group, Student, Teacher, Topic, User
+from bench import BENCH_DATABASE_URL
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    engines = [engine] if async_engine is None else [engine, async_engine.sync_engine]
+    for e in engines:
+        event.listen(e, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", counter._on_execute)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+# Every benchmark drops and recreates all tables. Anything but the default
+# throwaway file has to be opted into explicitly.
+def reset_schema() -> None:
+    if os.environ["DATABASE_URL"] != BENCH_DATABASE_URL and os.environ.get("BENCH_RESET_SCHEMA") != "1":
+        sys.exit(
+            f"refusing to drop every table in {engine.url.render_as_string(hide_password=True)}; "
+            "set BENCH_RESET_SCHEMA=1 if it is a throwaway database"
+        )
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def make_group(conn, name: str, students: int, days: list[date], discipline_id: int, topic_ids: list[int]) -> int:
+    group_id = conn.execute(insert(Group).values(name=name).returning(Group.id)).scalar_one()
+    base = conn.execute(select(User.id).order_by(User.id.desc()).limit(1)).scalar() or 0
+
+    conn.execute(
+        insert(User),
+        [
+            {
+                "username": f"{name}-s{i}",
+                "password_hash": "-",
+                "role": "student",
+                "full_name": f"Студент {name} {i}",
+                "is_active": True,
+            }
+            for i in range(students)
+        ],
+    )
+    user_ids = conn.execute(select(User.id).where(User.id > base).order_by(User.id)).scalars().all()
+    conn.execute(insert(Student), [{"user_id": uid, "group_id": group_id} for uid in user_ids])
+    student_ids = conn.execute(select(Student.id).where(Student.group_id == group_id)).scalars().all()
+
+    conn.execute(
+        insert(AttendanceRecord),
+        [
+            {
+                "student_id": sid,
+                "discipline_id": discipline_id,
+                "day": d,
+                "status": "присутствовал" if (sid + d.day) % 3 else "отсутствовал",
+            }
+            for sid in student_ids
+            for d in days
+        ],
+    )
+    if topic_ids:
+        conn.execute(
+            insert(GradeRecord),
+            [
+                {
+                    "student_id": sid,
+                    "discipline_id": discipline_id,
+                    "topic_id": tid,
+                    "points": (sid + tid) % 6,
+                    "max_points": 5,
+                }
+                for sid in student_ids
+                for tid in topic_ids
+            ],
+        )
+    return group_id
+
+
+def make_discipline(conn, topics: int) -> tuple[int, list[int]]:
+    user_id = conn.execute(
+        insert(User)
+        .values(username="bench-teacher", password_hash="-", role="teacher", full_name="Преподаватель", is_active=True)
+        .returning(User.id)
+    ).scalar_one()
+    teacher_id = conn.execute(insert(Teacher).values(user_id=user_id).returning(Teacher.id)).scalar_one()
+    discipline_id = conn.execute(
+        insert(Discipline).values(title="Bench", teacher_id=teacher_id).returning(Discipline.id)
+    ).scalar_one()
+    topic_ids = [
+        conn.execute(
+            insert(Topic)
+            .values(discipline_id=discipline_id, title=f"Тема {i}", content="", order_index=i)
+            .returning(Topic.id)
+        ).scalar_one()
+        for i in range(1, topics + 1)
+    ]
+    return discipline_id, topic_ids
+
+
+def semester_days(start: date, weeks: int) -> list[date]:
+    return [start + timedelta(days=7 * w + wd) for w in range(weeks) for wd in (0, 2)]
+
@@ -0,0 +1,128 @@
+"""Fails if any router query plans a sequential scan over a large table.
+
+    BENCH_RESET_SCHEMA=1 DATABASE_URL=postgresql+psycopg2://... python -m bench.explain_plans
+
+Seeds the database at a realistic size, drives every read endpoint in-process,
+captures the SQL each one issues and runs EXPLAIN on it. Needs PostgreSQL, and
+drops every table in it first.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import httpx
+from sqlalchemy import event, text
+
+from app.datagen import DatasetSpec, generate
+from app.db import engine
+from app.main import app
+from app.principals import principal_cache
+from app.security import create_access_token
+
+from bench.common import reset_schema
+
+# Tables below this many rows are cheaper to scan than to index, so the planner
+# is right to seq-scan them (groups, teachers, disciplines).
+SEQ_SCAN_ROWS = 1000
+
+
+def endpoints(ctx: dict) -> list[tuple[str, str, dict | None]]:
+    day = ctx["days"][0]
+    week_end = ctx["days"][3]
+    days = ",".join(d.isoformat() for d in ctx["days"][:8])
+    g, d = ctx["group_ids"][0], ctx["group_disciplines"][ctx["group_ids"][0]][0]
+    return [
+        ("POST", "/auth/login", {"username": ctx["student_usernames"][0], "password": "bench"}),
+        ("GET", "/auth/me", None),
+        ("GET", "/disciplines", None),
+        ("GET", f"/disciplines/{d}/topics", None),
+        ("GET", "/topics/1", None),
+        ("GET", f"/schedule/day?day={day}", None),
+        ("GET", f"/schedule/day?day={day}&group_id={g}", None),
+        ("GET", f"/schedule/week?start={day}&end={week_end}", None),
+        ("GET", f"/schedule/week?start={day}&end={week_end}&group_id={g}", None),
+        ("GET", f"/journal/attendance?group_id={g}&discipline_id={d}&days={days}", None),
+        ("GET", f"/journal/grades?group_id={g}&discipline_id={d}", None),
+        ("GET", f"/assignments/by_discipline/{d}", None),
+        ("GET", "/assignments/1", None),
+        ("GET", "/assignments/1/my", None),
+    ]
+
+
+async def capture(ctx: dict) -> list[tuple[str, str, object]]:
+    captured: list[tuple[str, str, object]] = []
+    current = {"path": ""}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current["path"], statement, parameters))
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(ctx['student_user_ids'][0]))}"}
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for method, path, body in endpoints(ctx):
+                principal_cache.clear()
+                current["path"] = path
+                r = await client.request(method, path, json=body, headers=headers)
+                r.raise_for_status()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = [plan["Relation Name"]] if plan.get("Node Type") == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--students", type=int, default=25)
+    parser.add_argument("--disciplines", type=int, default=10)
+    parser.add_argument("--weeks", type=int, default=16)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("explain_plans needs DATABASE_URL to point at PostgreSQL")
+        return 2
+
+    reset_schema()
+    spec = DatasetSpec(
+        groups=args.groups,
+        students_per_group=args.students,
+        disciplines=args.disciplines,
+        weeks=args.weeks,
+        password="bench",
+    )
+    with engine.begin() as conn:
+        ctx = generate(conn, spec)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+    captured = asyncio.run(capture(ctx))
+
+    failures = 0
+    with engine.connect() as conn:
+        reltuples = dict(
+            conn.execute(text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'")).all()
+        )
+        for path, statement, parameters in captured:
+            raw = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar_one()
+            plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+            bad = [rel for rel in seq_scans(plan) if reltuples.get(rel, 0) > SEQ_SCAN_ROWS]
+            status = "FAIL" if bad else "ok"
+            failures += bool(bad)
+            print(f"{status:>4} {path}")
+            if bad:
+                print(f"     seq scan on {', '.join(bad)}: {' '.join(statement.split())}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Checks that journal exports stream with flat memory as the faculty grows.
+
+    python -m bench.export
+
+Peak Python allocations while draining the export stream should not grow
+with the number of groups; output size does.
+"""
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+from app.datagen import DatasetSpec, generate
+from app.db import engine
+from app.journal_export import attendance_rows, grades_rows, stream_export
+
+from bench.common import reset_schema
+
+GROUPS = [8, 32, 96]
+START = date(2025, 9, 1)
+WEEKS = 16
+MAX_GROWTH = 2.0
+
+
+def drain(rows, fmt: str) -> tuple[int, float, float]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = sum(len(chunk) for chunk in stream_export(rows, fmt, "bench"))
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak / 1024, elapsed
+
+
+def main() -> int:
+    reset_schema()
+
+    cases = []
+    for groups in GROUPS:
+        spec = DatasetSpec(groups=groups, students_per_group=30, disciplines=4, disciplines_per_group=4, weeks=WEEKS)
+        with engine.begin() as conn:
+            result = generate(conn, spec)
+        cases.append((groups, result["discipline_ids"][0]))
+
+    end = date.fromordinal(START.toordinal() + 7 * WEEKS)
+    print(f"{'journal':>10} {'fmt':>4} {'groups':>6} {'kb out':>8} {'peak kb':>8} {'s':>6}")
+    peaks: dict[tuple[str, str], list[float]] = {}
+    for groups, discipline_id in cases:
+        for name, rows in (
+            ("attendance", lambda db: attendance_rows(db, discipline_id, None, START, end)),
+            ("grades", lambda db: grades_rows(db, discipline_id, None)),
+        ):
+            for fmt in ("csv", "xlsx"):
+                size, peak, elapsed = drain(rows, fmt)
+                peaks.setdefault((name, fmt), []).append(peak)
+                print(f"{name:>10} {fmt:>4} {groups:>6} {size / 1024:>8.0f} {peak:>8.0f} {elapsed:>6.2f}")
+
+    failed = [key for key, seen in peaks.items() if seen[-1] > seen[0] * MAX_GROWTH]
+    for name, fmt in failed:
+        print(f"FAIL: {name} {fmt} export memory grows with faculty size")
+    if failed:
+        return 1
+    print("OK: export memory is flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Checks that the journal builders issue a constant number of SQL statements.
+
+    python -m bench.journal_queries
+"""
+import sys
+import time
+from datetime import date
+
+from app.db import SessionLocal, engine
+from app.journal_engine import build_attendance_journal, build_grades_journal
+
+from bench.common import count_queries, make_discipline, make_group, reset_schema, semester_days
+
+SIZES = [(5, 2), (30, 8), (30, 16), (120, 16)]
+TOPICS = 16
+
+
+def measure(build) -> tuple[int, float]:
+    db = SessionLocal()
+    try:
+        with count_queries() as counter:
+            t0 = time.perf_counter()
+            build(db)
+            elapsed = (time.perf_counter() - t0) * 1000
+    finally:
+        db.close()
+    return counter.count, elapsed
+
+
+def main() -> int:
+    reset_schema()
+
+    cases = []
+    with engine.begin() as conn:
+        discipline_id, topic_ids = make_discipline(conn, TOPICS)
+        for students, weeks in SIZES:
+            days = semester_days(date(2025, 9, 1), weeks)
+            group_id = make_group(conn, f"g{students}x{weeks}", students, days, discipline_id, topic_ids)
+            cases.append((students, days, group_id))
+
+    print(f"{'journal':>10} {'students':>8} {'columns':>7} {'cells':>6} {'queries':>8} {'ms':>8}")
+    counts: dict[str, set[int]] = {"attendance": set(), "grades": set()}
+    for students, days, group_id in cases:
+        for name, columns, build in (
+            ("attendance", len(days), lambda db: build_attendance_journal(db, group_id, discipline_id, days)),
+            ("grades", TOPICS, lambda db: build_grades_journal(db, group_id, discipline_id)),
+        ):
+            queries, elapsed = measure(build)
+            counts[name].add(queries)
+            print(f"{name:>10} {students:>8} {columns:>7} {students * columns:>6} {queries:>8} {elapsed:>8.1f}")
+
+    failed = [name for name, seen in counts.items() if len(seen) != 1]
+    for name in failed:
+        print(f"FAIL: {name} journal query count depends on input size")
+    if failed:
+        return 1
+    print("OK: journal query counts are constant")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Checks live event fan-out across workers sharing one bus, slow-subscriber dropping, and delivery latency.
+
+    python -m bench.live [--subscribers 1000]
+
+Two hubs on one LocalBus stand in for two workers on LIVE_BUS_BACKEND=redis.
+Frames are published from a worker thread, as the sync endpoints do.
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+from app.live import LiveHub, LocalBus, sse_frame
+
+CHANNEL = "journal:1:1"
+
+
+def _publish_from_thread(hub: LiveHub, frame: bytes, count: int = 1) -> None:
+    def run() -> None:
+        for _ in range(count):
+            hub.publish(CHANNEL, frame)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+async def _drain(queue: asyncio.Queue, count: int) -> list:
+    return [await asyncio.wait_for(queue.get(), 5) for _ in range(count)]
+
+
+async def run(subscribers: int) -> int:
+    bus = LocalBus()
+    worker_a = LiveHub(bus, queue_size=8)
+    worker_b = LiveHub(bus, queue_size=8)
+
+    queues = [worker_b.subscribe(CHANNEL) for _ in range(subscribers)]
+    other = worker_b.subscribe("journal:1:2")
+    frame = sse_frame("grade", {"group_id": 1, "discipline_id": 1, "cells": [{"student_id": 1, "points": 4}]})
+
+    t0 = time.perf_counter()
+    _publish_from_thread(worker_a, frame)
+    received = await asyncio.gather(*(_drain(q, 1) for q in queues))
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"{subscribers} subscribers on the other worker received the frame in {elapsed:.2f} ms")
+    if any(r != [frame] for r in received) or not other.empty():
+        print("FAIL: frame missing on a subscribed channel or leaked to another channel")
+        return 1
+
+    slow = worker_b.subscribe(CHANNEL)
+    for q in queues:
+        worker_b.unsubscribe(CHANNEL, q)
+    _publish_from_thread(worker_a, frame, count=9)
+    await asyncio.sleep(0.05)
+    if slow.get_nowait() is not None or CHANNEL in worker_b.subscribers:
+        print("FAIL: a subscriber that fell behind was not dropped")
+        return 1
+    print("OK: frames cross workers and slow subscribers are dropped")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.live")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args.subscribers))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
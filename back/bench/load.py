@@ -0,0 +1,232 @@
+"""Latency, throughput and SQL-per-request benchmark for every router.
+
+    python -m bench.load --scales small,medium --requests 200 --concurrency 16
+    python -m bench.load --scales medium --save bench/baselines/medium.json
+    python -m bench.load --scales medium --compare bench/baselines/medium.json
+
+Each scale reseeds the database with app.datagen and drives the endpoints
+in-process with concurrent clients. --compare exits non-zero when p95 latency
+or statements per request regress beyond --tolerance.
+
+Every scenario runs with the response cache disabled, so handler and SQL
+regressions show up. Endpoints served through the cache get a second
+`<endpoint>_warm` row measured against a primed cache.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+from sqlalchemy import select
+
+from app.config import settings
+from app.datagen import DatasetSpec, generate
+from app.db import engine
+from app.main import app
+from app.models import Assignment, Student, Topic
+from app.response_cache import LocalBackend, NullBackend, response_cache
+from app.security import create_access_token
+
+from bench.common import count_queries, percentile, reset_schema
+
+SCALES = {
+    "small": DatasetSpec(groups=3, students_per_group=25, disciplines=5, weeks=4),
+    "medium": DatasetSpec(groups=40, students_per_group=25, disciplines=10, weeks=16),
+    "large": DatasetSpec(groups=200, students_per_group=30, disciplines=20, weeks=16),
+}
+PASSWORD = "bench"
+CACHED = {"attendance_journal", "grades_journal", "schedule_week"}
+
+
+@dataclass
+class Result:
+    scale: str
+    endpoint: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rps: float
+    sql_per_request: float
+
+
+def scenarios(ctx: dict) -> list[tuple[str, str, str, object, str]]:
+    group_id = ctx["group_ids"][0]
+    discipline_id = ctx["group_disciplines"][group_id][0]
+    days = ctx["days"]
+    journal_days = ",".join(d.isoformat() for d in days)
+    assignment_id = ctx["assignment_ids"][discipline_id]
+    student_id = ctx["student_ids"][0]
+    return [
+        ("login", "POST", "/auth/login", {"username": ctx["student_usernames"][0], "password": PASSWORD}, "anon"),
+        ("me", "GET", "/auth/me", None, "student"),
+        ("dashboard", "GET", f"/dashboard?start={days[0]}", None, "student"),
+        ("disciplines", "GET", "/disciplines", None, "student"),
+        ("topics", "GET", f"/disciplines/{discipline_id}/topics", None, "student"),
+        ("topic", "GET", f"/topics/{ctx['topic_id']}", None, "student"),
+        ("schedule_day", "GET", f"/schedule/day?day={days[0]}", None, "student"),
+        ("schedule_week", "GET", f"/schedule/week?start={days[0]}&end={days[4]}", None, "student"),
+        (
+            "attendance_journal",
+            "GET",
+            f"/journal/attendance?group_id={group_id}&discipline_id={discipline_id}&days={journal_days}",
+            None,
+            "teacher",
+        ),
+        ("grades_journal", "GET", f"/journal/grades?group_id={group_id}&discipline_id={discipline_id}", None, "teacher"),
+        ("assignment_submit", "POST", f"/assignments/{assignment_id}/submit", {"answer_text": "Ответ"}, "student"),
+        (
+            "assignment_grade",
+            "POST",
+            f"/assignments/{assignment_id}/grade",
+            {"student_id": student_id, "points": 5},
+            "teacher",
+        ),
+    ]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    method: str,
+    path: str,
+    body,
+    headers: dict,
+    requests: int,
+    concurrency: int,
+) -> tuple[list[float], int, float, int]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            t0 = time.perf_counter()
+            r = await client.request(method, path, json=body, headers=headers)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += r.status_code >= 400
+
+    with count_queries() as counter:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return latencies, errors, elapsed, counter.count
+
+
+async def run_scale(name: str, spec: DatasetSpec, requests: int, concurrency: int) -> list[Result]:
+    spec.password = PASSWORD
+    reset_schema()
+    with engine.begin() as conn:
+        ctx = generate(conn, spec)
+        ctx.update(_lookup_ids(conn, ctx))
+
+    tokens = {
+        "anon": {},
+        "student": {"Authorization": f"Bearer {create_access_token(str(ctx['student_user_ids'][0]))}"},
+        "teacher": {"Authorization": f"Bearer {create_access_token(str(ctx['teacher_user_ids'][0]))}"},
+    }
+
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for endpoint, method, path, body, who in scenarios(ctx):
+            # Logins are bounded by the bcrypt pool; more clients than slots only measures 503s.
+            n, c = requests, concurrency
+            if endpoint == "login":
+                n, c = max(1, requests // 10), min(concurrency, settings.password_workers)
+            runs = [(endpoint, NullBackend())]
+            if endpoint in CACHED:
+                runs.append((f"{endpoint}_warm", LocalBackend(settings.response_cache_max_bytes, 3600)))
+            for label, backend in runs:
+                response_cache.backend = backend
+                await client.request(method, path, json=body, headers=tokens[who])
+                latencies, errors, elapsed, statements = await run_scenario(
+                    client, method, path, body, tokens[who], n, c
+                )
+                results.append(
+                    Result(
+                        scale=name,
+                        endpoint=label,
+                        requests=n,
+                        errors=errors,
+                        p50_ms=round(percentile(latencies, 0.50), 2),
+                        p95_ms=round(percentile(latencies, 0.95), 2),
+                        p99_ms=round(percentile(latencies, 0.99), 2),
+                        rps=round(n / elapsed, 1),
+                        sql_per_request=round(statements / n, 2),
+                    )
+                )
+    return results
+
+
+def _lookup_ids(conn, ctx: dict) -> dict:
+    return {
+        "assignment_ids": dict(conn.execute(select(Assignment.discipline_id, Assignment.id)).all()),
+        "topic_id": conn.execute(select(Topic.id).order_by(Topic.id).limit(1)).scalar_one(),
+        "student_ids": conn.execute(
+            select(Student.id).where(Student.user_id.in_(ctx["student_user_ids"][:1]))
+        ).scalars().all(),
+    }
+
+
+def print_results(results: list[Result]) -> None:
+    print(
+        f"{'scale':>7} {'endpoint':>24} {'reqs':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'rps':>8} {'sql/req':>8}"
+    )
+    for r in results:
+        print(
+            f"{r.scale:>7} {r.endpoint:>24} {r.requests:>5} {r.errors:>4} {r.p50_ms:>8.2f} {r.p95_ms:>8.2f} "
+            f"{r.p99_ms:>8.2f} {r.rps:>8.1f} {r.sql_per_request:>8.2f}"
+        )
+
+
+def compare(results: list[Result], baseline_path: Path, tolerance: float) -> int:
+    baseline = {(b["scale"], b["endpoint"]): b for b in json.loads(baseline_path.read_text())}
+    regressions = 0
+    print(f"\n{'scale':>7} {'endpoint':>24} {'p95 base':>9} {'p95 now':>9} {'Δ%':>7} {'sql base':>9} {'sql now':>8}")
+    for r in results:
+        b = baseline.get((r.scale, r.endpoint))
+        if not b:
+            continue
+        delta = (r.p95_ms - b["p95_ms"]) / b["p95_ms"] * 100 if b["p95_ms"] else 0.0
+        flag = ""
+        if delta > tolerance * 100 or r.sql_per_request > b["sql_per_request"]:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(
+            f"{r.scale:>7} {r.endpoint:>24} {b['p95_ms']:>9.2f} {r.p95_ms:>9.2f} {delta:>+7.1f} "
+            f"{b['sql_per_request']:>9.2f} {r.sql_per_request:>8.2f}{flag}"
+        )
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="small", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--save", type=Path, help="write results as a baseline JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON file to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results: list[Result] = []
+    for name in args.scales.split(","):
+        results.extend(asyncio.run(run_scale(name, SCALES[name], args.requests, args.concurrency)))
+
+    print_results(results)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps([asdict(r) for r in results], indent=2))
+    if args.compare:
+        return compare(results, args.compare, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
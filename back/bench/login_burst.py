@@ -0,0 +1,74 @@
+"""Measures latency of an ordinary endpoint while a burst of logins is in flight.
+
+    python -m bench.login_burst --logins 200 --probes 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import insert
+
+from app.db import engine
+from app.main import app
+from app.models import User
+from app.security import create_access_token, hash_password
+
+from bench.common import make_discipline, percentile, reset_schema
+
+
+async def probe(client: httpx.AsyncClient, headers: dict, count: int) -> list[float]:
+    latencies = []
+    for _ in range(count):
+        t0 = time.perf_counter()
+        r = await client.get("/disciplines", headers=headers)
+        r.raise_for_status()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+async def run(logins: int, probes: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with engine.begin() as conn:
+            make_discipline(conn, 0)
+            user_id = conn.execute(
+                insert(User)
+                .values(username="bench", password_hash=hash_password("bench"), role="student", full_name="Bench")
+                .returning(User.id)
+            ).scalar_one()
+        headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+
+        await probe(client, headers, 5)
+        idle = await probe(client, headers, probes)
+
+        body = {"username": "bench", "password": "bench"}
+        login_tasks = [asyncio.create_task(client.post("/auth/login", json=body)) for _ in range(logins)]
+        t0 = time.perf_counter()
+        busy = await probe(client, headers, probes)
+        responses = await asyncio.gather(*login_tasks)
+        elapsed = time.perf_counter() - t0
+
+    statuses = Counter(r.status_code for r in responses)
+    print(f"{'phase':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, values in (("idle", idle), ("burst", busy)):
+        print(f"{name:>6} {statistics.median(values):>8.1f} {percentile(values, 0.95):>8.1f} {max(values):>8.1f}")
+    print(f"logins: {dict(statuses)} in {elapsed:.1f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--probes", type=int, default=50)
+    args = parser.parse_args()
+
+    reset_schema()
+    asyncio.run(run(args.logins, args.probes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
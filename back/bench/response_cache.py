@@ -0,0 +1,88 @@
+"""Checks response cache coherence across workers, shared or per-worker, and hit vs miss latency.
+
+    python -m bench.response_cache
+"""
+import sys
+import time
+from datetime import date
+
+from app.db import SessionLocal, engine
+from app.fastjson import dumps
+from app.journal_engine import build_grades_journal, grades_journal_state
+from app.journal_writes import upsert_grade_rows
+from app.response_cache import FakeRedis, LocalBackend, RedisBackend, ResponseCache, journal_scope
+
+from bench.common import make_discipline, make_group, reset_schema, semester_days
+
+STUDENTS = 120
+TOPICS = 16
+ROUNDS = 200
+
+
+def _get(cache: ResponseCache, group_id: int, discipline_id: int) -> tuple[bytes, float]:
+    # Same resolve/build/store sequence as app.response_cache.cached_json.
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    try:
+        key, etag, body = cache.resolve(
+            [journal_scope(group_id, discipline_id)],
+            ("grades", group_id, discipline_id),
+            lambda: grades_journal_state(db, group_id, discipline_id),
+        )
+        if body is None:
+            body = dumps(build_grades_journal(db, group_id, discipline_id))
+            cache.store(key, etag.encode() + b"\n" + body)
+    finally:
+        db.close()
+    return body, (time.perf_counter() - t0) * 1000
+
+
+def _check(label: str, worker_a: ResponseCache, worker_b: ResponseCache, ids: tuple, points: int) -> bool:
+    group_id, discipline_id, topic_id = ids
+    before, miss_ms = _get(worker_a, group_id, discipline_id)
+    hits = sorted(_get(worker_b, group_id, discipline_id)[1] for _ in range(ROUNDS))
+    print(f"{label}: miss {miss_ms:.2f} ms, hit p50 {hits[len(hits) // 2]:.3f} ms over {ROUNDS} lookups")
+
+    db = SessionLocal()
+    try:
+        student_id = build_grades_journal(db, group_id, discipline_id)["rows"][0]["student"]["id"]
+        cell = dict(student_id=student_id, discipline_id=discipline_id, topic_id=topic_id, points=points, max_points=5)
+        upsert_grade_rows(db, [cell])
+        db.commit()
+    finally:
+        db.close()
+    worker_a.invalidate([journal_scope(group_id, discipline_id)])
+
+    after, _ = _get(worker_b, group_id, discipline_id)
+    if after == before:
+        print(f"FAIL: {label} worker B served a journal invalidated by worker A")
+        return False
+    return True
+
+
+def main() -> int:
+    reset_schema()
+    with engine.begin() as conn:
+        discipline_id, topic_ids = make_discipline(conn, TOPICS)
+        days = semester_days(date(2025, 9, 1), 1)
+        group_id = make_group(conn, "cached", STUDENTS, days, discipline_id, topic_ids)
+
+    ids = (group_id, discipline_id, topic_ids[0])
+    # Two workers whose caches share one store, as with RESPONSE_CACHE_BACKEND=redis.
+    shared = FakeRedis()
+    redis_a = ResponseCache("bench_a", RedisBackend(shared, ttl=60))
+    redis_b = ResponseCache("bench_b", RedisBackend(shared, ttl=60))
+    # Two workers with their own stores, as with the default RESPONSE_CACHE_BACKEND=local.
+    local_a = ResponseCache("bench_c", LocalBackend(1 << 24, ttl=3600))
+    local_b = ResponseCache("bench_d", LocalBackend(1 << 24, ttl=3600))
+
+    ok = _check("shared", redis_a, redis_b, ids, 1)
+    ok = _check("local", local_a, local_b, ids, 2) and ok
+    if not ok:
+        return 1
+    print("OK: a write on one worker is visible to the other")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Micro-benchmark: per-row Pydantic models + response_model validation vs dicts encoded with orjson.
+
+    python -m bench.serialization [--rows 1000] [--rounds 50]
+
+No database involved: both paths get the same pre-fetched row tuples, so the
+numbers are pure CPU spent turning rows into response bytes.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import date, time as clock, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.fastjson import dumps
+from app.journal_engine import NOT_SET
+from app.schemas import (
+    JournalAttendanceOut,
+    JournalAttendanceStudentRow,
+    ScheduleItemOut,
+    StudentShort,
+    WeekScheduleOut,
+)
+
+DAYS = 16
+
+
+def _attendance_input(rows: int):
+    days = [date(2025, 9, 1) + timedelta(days=i) for i in range(DAYS)]
+    students = [(i, f"Студент {i}") for i in range(1, rows + 1)]
+    cells = {(s, d): "присутствовал" for s, _ in students for d in days if (s + d.day) % 5}
+    return days, students, cells
+
+
+def _schedule_input(rows: int):
+    return [
+        (i, date(2025, 9, 1) + timedelta(days=i % 5), clock(9, 0), clock(10, 30), "101", "Дисциплина", "Группа")
+        for i in range(rows)
+    ]
+
+
+def legacy_attendance(days, students, cells):
+    keys = [(d, d.isoformat()) for d in days]
+    return JournalAttendanceOut(
+        days=days,
+        rows=[
+            JournalAttendanceStudentRow(
+                student=StudentShort(id=student_id, full_name=full_name),
+                statuses={iso: cells.get((student_id, d), NOT_SET) for d, iso in keys},
+            )
+            for student_id, full_name in students
+        ],
+    )
+
+
+def fast_attendance(days, students, cells):
+    keys = [(d, d.isoformat()) for d in days]
+    return {
+        "days": days,
+        "rows": [
+            {
+                "student": {"id": student_id, "full_name": full_name},
+                "statuses": {iso: cells.get((student_id, d), NOT_SET) for d, iso in keys},
+            }
+            for student_id, full_name in students
+        ],
+    }
+
+
+def legacy_schedule(rows):
+    items = [
+        ScheduleItemOut(
+            id=id_,
+            day=day,
+            start_time=start_time,
+            end_time=end_time,
+            room=room,
+            discipline_title=discipline_title,
+            group_name=group_name,
+        )
+        for id_, day, start_time, end_time, room, discipline_title, group_name in rows
+    ]
+    return WeekScheduleOut(start=rows[0][1], end=rows[-1][1], items=items)
+
+
+def fast_schedule(rows):
+    items = [
+        {
+            "id": id_,
+            "day": day,
+            "start_time": start_time,
+            "end_time": end_time,
+            "room": room,
+            "discipline_title": discipline_title,
+            "group_name": group_name,
+        }
+        for id_, day, start_time, end_time, room, discipline_title, group_name in rows
+    ]
+    return {"start": rows[0][1], "end": rows[-1][1], "items": items, "next_cursor": None}
+
+
+def _cpu_ms(fn, rounds: int) -> float:
+    t0 = time.process_time()
+    for _ in range(rounds):
+        fn()
+    return (time.process_time() - t0) * 1000 / rounds
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.serialization")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("attendance", JournalAttendanceOut, legacy_attendance, fast_attendance, _attendance_input(args.rows)),
+        ("schedule", WeekScheduleOut, legacy_schedule, fast_schedule, (_schedule_input(args.rows),)),
+    ]
+
+    # One loop for every round, so the legacy side pays for serialization only
+    # and not for creating an event loop each time.
+    loop = asyncio.new_event_loop()
+    print(f"{'payload':>10} {'rows':>6} {'kb':>7} {'legacy ms':>10} {'fast ms':>8} {'saved':>6}")
+    for name, model, legacy, fast, inputs in cases:
+        field = create_model_field(name="response", type_=model, mode="serialization")
+
+        def legacy_path() -> bytes:
+            # What FastAPI does with a model returned from a route with response_model.
+            content = loop.run_until_complete(serialize_response(field=field, response_content=legacy(*inputs)))
+            return JSONResponse(content).body
+
+        def fast_path() -> bytes:
+            return dumps(fast(*inputs))
+
+        if json.loads(legacy_path()) != json.loads(fast_path()):
+            print(f"FAIL: {name} payloads differ")
+            loop.close()
+            return 1
+
+        legacy_ms = _cpu_ms(legacy_path, args.rounds)
+        fast_ms = _cpu_ms(fast_path, args.rounds)
+        size = len(fast_path()) / 1024
+        print(
+            f"{name:>10} {args.rows:>6} {size:>7.0f} {legacy_ms:>10.2f} {fast_ms:>8.2f} "
+            f"{1 - fast_ms / legacy_ms:>6.0%}"
+        )
+    loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(64), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("role", sa.String(16), nullable=False),
+        sa.Column("full_name", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "teachers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+    )
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(64), nullable=False, unique=True),
+    )
+    op.create_table(
+        "students",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), nullable=False),
+    )
+    op.create_table(
+        "disciplines",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("teacher_id", sa.Integer(), sa.ForeignKey("teachers.id"), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+        sa.Column("hours_total", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "topics",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("discipline_id", sa.Integer(), sa.ForeignKey("disciplines.id"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("order_index", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "assignments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("topic_id", sa.Integer(), sa.ForeignKey("topics.id"), nullable=False),
+        sa.Column("discipline_id", sa.Integer(), sa.ForeignKey("disciplines.id"), nullable=False),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "assignment_submissions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False),
+        sa.Column("assignment_id", sa.Integer(), sa.ForeignKey("assignments.id"), nullable=False),
+        sa.Column("answer_text", sa.String(), nullable=False),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("student_id", "assignment_id", name="uq_assignment_submission"),
+    )
+    op.create_table(
+        "schedule_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("discipline_id", sa.Integer(), sa.ForeignKey("disciplines.id"), nullable=False),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("room", sa.String(64), nullable=False),
+    )
+    op.create_table(
+        "attendance_records",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False),
+        sa.Column("discipline_id", sa.Integer(), sa.ForeignKey("disciplines.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("student_id", "discipline_id", "day", name="uq_attendance"),
+    )
+    op.create_table(
+        "grade_records",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), nullable=False),
+        sa.Column("discipline_id", sa.Integer(), sa.ForeignKey("disciplines.id"), nullable=False),
+        sa.Column("topic_id", sa.Integer(), sa.ForeignKey("topics.id"), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("max_points", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("student_id", "discipline_id", "topic_id", name="uq_grade"),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "grade_records",
+        "attendance_records",
+        "schedule_items",
+        "assignment_submissions",
+        "assignments",
+        "topics",
+        "disciplines",
+        "students",
+        "groups",
+        "teachers",
+    ):
+        op.drop_table(table)
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,32 @@
+"""indexes for hot lookup paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_students_group_id", "students", ["group_id"]),
+    ("ix_disciplines_teacher_id", "disciplines", ["teacher_id"]),
+    ("ix_topics_discipline_order", "topics", ["discipline_id", "order_index"]),
+    ("ix_assignments_discipline_id", "assignments", ["discipline_id", "id"]),
+    ("ix_assignment_submissions_assignment_student", "assignment_submissions", ["assignment_id", "student_id"]),
+    ("ix_schedule_items_day_start", "schedule_items", ["day", "start_time"]),
+    ("ix_schedule_items_group_day", "schedule_items", ["group_id", "day", "start_time"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,34 @@
+"""extend schedule indexes with id for keyset pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_schedule_items_day_start", "schedule_items", ["day", "start_time"], ["day", "start_time", "id"]),
+    (
+        "ix_schedule_items_group_day",
+        "schedule_items",
+        ["group_id", "day", "start_time"],
+        ["group_id", "day", "start_time", "id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    for name, table, _, columns in INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, columns, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, columns)
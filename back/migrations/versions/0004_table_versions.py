@@ -0,0 +1,28 @@
+"""per-table version counters for conditional requests
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = ["users", "teachers", "groups", "students", "disciplines", "topics", "assignments", "schedule_items"]
+
+
+def upgrade() -> None:
+    table_versions = op.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(64), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(table_versions, [{"name": name, "version": 1} for name in TABLES])
+
+
+def downgrade() -> None:
+    op.drop_table("table_versions")
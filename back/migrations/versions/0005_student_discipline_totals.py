@@ -0,0 +1,54 @@
+"""materialized per-student discipline totals
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+INSERT INTO student_discipline_totals
+    (student_id, discipline_id, grade_points, submission_points, present_count, absent_count, marked_count, updated_at)
+SELECT student_id, discipline_id, SUM(grade_points), SUM(submission_points), SUM(present), SUM(absent), SUM(marked),
+       CURRENT_TIMESTAMP
+FROM (
+    SELECT student_id, discipline_id, points AS grade_points, 0 AS submission_points, 0 AS present, 0 AS absent,
+           0 AS marked
+    FROM grade_records
+    UNION ALL
+    SELECT student_id, discipline_id, 0, 0,
+           CASE WHEN status = 'присутствовал' THEN 1 ELSE 0 END,
+           CASE WHEN status = 'отсутствовал' THEN 1 ELSE 0 END,
+           CASE WHEN status = 'не выставлено' THEN 0 ELSE 1 END
+    FROM attendance_records
+    UNION ALL
+    SELECT s.student_id, a.discipline_id, 0, CASE WHEN s.status = 'проверено' THEN s.points ELSE 0 END, 0, 0, 0
+    FROM assignment_submissions s JOIN assignments a ON a.id = s.assignment_id
+) cells
+GROUP BY student_id, discipline_id
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "student_discipline_totals",
+        sa.Column("student_id", sa.Integer(), sa.ForeignKey("students.id"), primary_key=True),
+        sa.Column("discipline_id", sa.Integer(), sa.ForeignKey("disciplines.id"), primary_key=True),
+        sa.Column("grade_points", sa.Integer(), nullable=False),
+        sa.Column("submission_points", sa.Integer(), nullable=False),
+        sa.Column("present_count", sa.Integer(), nullable=False),
+        sa.Column("absent_count", sa.Integer(), nullable=False),
+        sa.Column("marked_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table("student_discipline_totals")
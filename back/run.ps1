@@ -1 +1,3 @@
+python -m app.migrate upgrade
+python -m app.migrate seed
 python -m uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
@@ -1,4 +1,4 @@
-import { apiRequest } from './client';
+import { apiRequest, apiRequestAll } from './client';
 
 export function getAssignment(assignmentId) {
   return apiRequest(`/assignments/${assignmentId}`);
@@ -13,5 +13,5 @@ export function submitAssignment(assignmentId, answerText) {
 }
 
 export function getAssignmentsByDiscipline(disciplineId) {
-  return apiRequest(`/assignments/by_discipline/${disciplineId}`);
+  return apiRequestAll(`/assignments/by_discipline/${disciplineId}`);
 }
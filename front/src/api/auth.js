@@ -4,6 +4,10 @@ export async function login(username, password) {
   return apiRequest('/auth/login', { method: 'POST', body: { username, password }, auth: false });
 }
 
+export async function logout() {
+  return apiRequest('/auth/logout', { method: 'POST' });
+}
+
 export async function me() {
   return apiRequest('/auth/me');
 }
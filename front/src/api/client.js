@@ -4,7 +4,11 @@ function getToken() {
   return localStorage.getItem('token') || '';
 }
 
-export async function apiRequest(path, { method = 'GET', body, headers = {}, auth = true } = {}) {
+// Paged lists answer with the next page's cursor in this header (or in a
+// next_cursor field for wrapped responses).
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+
+async function send(path, { method = 'GET', body, headers = {}, auth = true } = {}) {
   const h = { ...headers };
   if (body !== undefined) {
     h['Content-Type'] = 'application/json';
@@ -31,10 +35,41 @@ export async function apiRequest(path, { method = 'GET', body, headers = {}, aut
     err.status = res.status;
     throw err;
   }
+  return res;
+}
 
+function withCursor(path, cursor) {
+  return `${path}${path.includes('?') ? '&' : '?'}cursor=${encodeURIComponent(cursor)}`;
+}
+
+export async function apiRequest(path, options) {
+  const res = await send(path, options);
   const ct = res.headers.get('content-type') || '';
   if (ct.includes('application/json')) {
     return res.json();
   }
   return res.text();
 }
+
+// Fetches every page of a list endpoint that pages through X-Next-Cursor.
+export async function apiRequestAll(path) {
+  const items = [];
+  let cursor = null;
+  do {
+    const res = await send(cursor ? withCursor(path, cursor) : path);
+    items.push(...(await res.json()));
+    cursor = res.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+  return items;
+}
+
+// Same for responses that wrap their rows in `items` next to `next_cursor`.
+export async function apiRequestAllItems(path) {
+  let page = await apiRequest(path);
+  const items = [...page.items];
+  while (page.next_cursor) {
+    page = await apiRequest(withCursor(path, page.next_cursor));
+    items.push(...page.items);
+  }
+  return { ...page, items };
+}
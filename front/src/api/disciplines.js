@@ -1,7 +1,7 @@
-import { apiRequest } from './client';
+import { apiRequest, apiRequestAll } from './client';
 
 export function getDisciplines() {
-  return apiRequest('/disciplines');
+  return apiRequestAll('/disciplines');
 }
 
 export function getTopicsByDiscipline(disciplineId) {
@@ -1,9 +1,9 @@
-import { apiRequest } from './client';
+import { apiRequest, apiRequestAllItems } from './client';
 
 export function getScheduleDay(day) {
   return apiRequest(`/schedule/day?day=${day}`);
 }
 
 export function getScheduleWeek(start, end) {
-  return apiRequest(`/schedule/week?start=${start}&end=${end}`);
+  return apiRequestAllItems(`/schedule/week?start=${start}&end=${end}`);
 }
@@ -1,6 +1,6 @@
 import React, { createContext, useCallback, useContext, useEffect, useMemo, useState } from 'react';
 
-import { login as apiLogin, me as apiMe } from '../api/auth';
+import { login as apiLogin, logout as apiLogout, me as apiMe } from '../api/auth';
 
 const AuthContext = createContext(null);
 
@@ -37,7 +37,12 @@ export function AuthProvider({ children }) {
     await refresh();
   }, [refresh]);
 
-  const signOut = useCallback(() => {
+  const signOut = useCallback(async () => {
+    try {
+      await apiLogout();
+    } catch (_) {
+      // The token is dropped locally either way.
+    }
     localStorage.removeItem('token');
     setUser(null);
   }, []);